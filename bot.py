@@ -9,12 +9,19 @@ import asyncio
 import sys
 from pathlib import Path
 
-from telegram.ext import Application
+from telegram import LinkPreviewOptions
+from telegram.ext import AIORateLimiter, Application, Defaults
 
 import config
 from filters.spam_filter import SpamFilter
-from database.db import Database
-from handlers import setup_message_handlers, setup_member_handlers, setup_admin_handlers
+from database.db import Database, ViolationWriter
+from handlers import (
+    setup_message_handlers,
+    setup_member_handlers,
+    setup_admin_handlers,
+    VerificationExpiryScheduler,
+    NotificationBatcher,
+)
 
 # 設定日誌
 logging.basicConfig(
@@ -26,21 +33,46 @@ logger = logging.getLogger(__name__)
 
 async def post_init(application: Application) -> None:
     """Bot 初始化後的設定"""
-    # 初始化資料庫
-    db = Database(config.DATABASE_PATH)
+    # 連線資料庫（物件已於 main() 建立）
+    db: Database = application.bot_data["database"]
     await db.connect()
-    application.bot_data["database"] = db
 
-    # 初始化垃圾訊息過濾器
-    keywords_path = Path(__file__).parent / config.KEYWORDS_FILE
-    spam_filter = SpamFilter(str(keywords_path))
-    application.bot_data["spam_filter"] = spam_filter
+    # 違規記錄批次寫入
+    violation_writer: ViolationWriter = application.bot_data["violation_writer"]
+    violation_writer.start()
+
+    # 驗證到期排程（含重新啟動前尚未完成的驗證）
+    scheduler = VerificationExpiryScheduler(application.bot, db)
+    scheduler.start(await db.get_pending_verifications())
+    application.bot_data["expiry_scheduler"] = scheduler
+
+    # 管理員通知合併發送
+    application.bot_data["notification_batcher"] = NotificationBatcher(application.bot)
 
     logger.info("Bot initialized successfully")
 
 
 async def post_shutdown(application: Application) -> None:
     """Bot 關閉時的清理"""
+    scheduler: VerificationExpiryScheduler = application.bot_data.get("expiry_scheduler")
+    if scheduler:
+        await scheduler.stop()
+
+    # 送出尚在合併中的管理員通知
+    batcher: NotificationBatcher = application.bot_data.get("notification_batcher")
+    if batcher:
+        await batcher.close()
+
+    # 寫入佇列中剩餘的違規記錄（需在關閉資料庫之前）
+    violation_writer: ViolationWriter = application.bot_data.get("violation_writer")
+    if violation_writer:
+        await violation_writer.close()
+
+    # 寫回尚未儲存的關鍵字變更
+    spam_filter: SpamFilter = application.bot_data.get("spam_filter")
+    if spam_filter:
+        spam_filter.flush()
+
     db: Database = application.bot_data.get("database")
     if db:
         await db.close()
@@ -55,23 +87,48 @@ def main() -> None:
         logger.error("您可以從 @BotFather 取得 Token")
         sys.exit(1)
 
-    # 建立 Application
+    # 建立 Application（並行處理更新，避免單一較慢的 handler 阻塞其他群組）
     application = (
         Application.builder()
         .token(config.BOT_TOKEN)
+        .concurrent_updates(True)
+        # 加大連線池並使用 HTTP/2，大量成員加入時的 API 請求可在同一連線上多工
+        .connection_pool_size(256)
+        .pool_timeout(10.0)
+        .http_version("2")
+        # getUpdates 只有單一長輪詢請求，不必與其他請求共用大連線池
+        .get_updates_connection_pool_size(1)
+        # 依 Telegram 全域限制（每秒 30 則）排隊並於 RetryAfter 時重試；
+        # 不啟用每群組每分鐘 20 則的限制，洗版時刪除與禁言不能被延後
+        .rate_limiter(AIORateLimiter(overall_max_rate=30, group_max_rate=0, max_retries=3))
+        # Bot 的回覆都不需要連結預覽，省去 Telegram 端抓取預覽的工作
+        .defaults(Defaults(link_preview_options=LinkPreviewOptions(is_disabled=True)))
         .post_init(post_init)
         .post_shutdown(post_shutdown)
         .build()
     )
 
+    # 建立資料庫與垃圾訊息過濾器；訊息處理器直接綁定，其他處理器經由 bot_data 取用
+    db = Database(config.DATABASE_PATH)
+    keywords_path = Path(__file__).parent / config.KEYWORDS_FILE
+    spam_filter = SpamFilter(str(keywords_path))
+    violation_writer = ViolationWriter(db)
+    application.bot_data["database"] = db
+    application.bot_data["spam_filter"] = spam_filter
+    application.bot_data["violation_writer"] = violation_writer
+
     # 註冊 handlers
-    setup_message_handlers(application)
+    setup_message_handlers(application, spam_filter, db, violation_writer)
     setup_member_handlers(application)
     setup_admin_handlers(application)
 
     # 啟動 Bot
     logger.info(f"Starting {config.BOT_NAME} (掃地僧)...")
+    # 長輪詢：有更新立即返回，無更新時最多等待 30 秒，減少 getUpdates 往返次數
     application.run_polling(
+        poll_interval=0.0,
+        timeout=30,
+        bootstrap_retries=-1,
         allowed_updates=[
             "message",
             "callback_query",
@@ -9,6 +9,11 @@ BOT_NAME = "SweepMonk"
 # Telegram Bot Token (優先從環境變數讀取，部署用)
 BOT_TOKEN = os.getenv("BOT_TOKEN", "YOUR_BOT_TOKEN_HERE")
 
+# 超級管理員（Bot 擁有者）的用戶 ID，逗號分隔；在任何群組都視為管理員
+SUPERADMIN_IDS: frozenset[int] = frozenset(
+    int(user_id) for user_id in os.getenv("SUPERADMIN_IDS", "").split(",") if user_id.strip()
+)
+
 # 資料庫檔案路徑
 DATABASE_PATH = "bot_data.db"
 
@@ -2,6 +2,6 @@
 Database 模組
 """
 
-from .db import Database
+from .db import Database, ChatSettings, ViolationWriter
 
-__all__ = ["Database"]
+__all__ = ["Database", "ChatSettings", "ViolationWriter"]
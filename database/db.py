@@ -4,38 +4,262 @@
 """
 
 import aiosqlite
+import asyncio
+import contextvars
 import logging
-from datetime import datetime
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+import config
+
 logger = logging.getLogger(__name__)
 
+# 群組設定記憶體快取的最大筆數
+CACHE_MAX_SIZE = 1024
+
+# 群組設定快取的有效秒數（資料庫被外部修改時，最多延遲此秒數生效）
+SETTINGS_CACHE_TTL = 60
+
+# 唯讀連線池大小（WAL 模式下讀取不會阻塞寫入）
+READ_POOL_SIZE = 4
+
+# 待驗證記錄的變更每隔此秒數批次寫入快照
+PENDING_FLUSH_INTERVAL = 1.0
+
+# violations 表內只保留訊息摘要，較長的全文另存於 violation_texts
+VIOLATION_EXCERPT_LENGTH = 64
+
+# 違規記錄批次寫入：每批最多筆數、收集等待秒數、佇列上限（滿時捨棄新記錄）
+VIOLATION_BATCH_SIZE = 100
+VIOLATION_BATCH_INTERVAL = 0.5
+VIOLATION_QUEUE_SIZE = 10_000
+
+# 違規記錄寫入失敗時保留整批重試：首次間隔、間隔上限（秒）、關閉期間的最多嘗試次數
+VIOLATION_RETRY_DELAY = 0.5
+VIOLATION_RETRY_MAX_DELAY = 30.0
+VIOLATION_SHUTDOWN_ATTEMPTS = 3
+
+# === SQL 語句 ===
+# 固定的語句字串可讓 sqlite3 的 statement cache 重複使用已編譯的程式
+# expires_at 以 Unix 時間戳（整數秒）儲存
+
+SQL_UPSERT_USER = """
+    INSERT INTO users (user_id, username, first_name, last_name)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        username = excluded.username,
+        first_name = excluded.first_name,
+        last_name = excluded.last_name,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING *
+"""
+SQL_INCREMENT_VIOLATION_COUNT = """
+    UPDATE users
+    SET violation_count = violation_count + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = ?
+"""
+SQL_SELECT_VIOLATION_COUNT = "SELECT violation_count FROM users WHERE user_id = ?"
+# 建立/更新用戶並增加違規次數，單一語句完成（批次寫入時以 executemany 執行）
+SQL_UPSERT_USER_VIOLATION = """
+    INSERT INTO users (user_id, username, first_name, last_name, violation_count)
+    VALUES (?, ?, ?, ?, 1)
+    ON CONFLICT(user_id) DO UPDATE SET
+        username = excluded.username,
+        first_name = excluded.first_name,
+        last_name = excluded.last_name,
+        violation_count = violation_count + 1,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+SQL_INSERT_VIOLATION = """
+    INSERT INTO violations
+        (user_id, chat_id, display_name, message_text, matched_keyword, action_taken)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SQL_INSERT_VIOLATION_TEXT = "INSERT INTO violation_texts (violation_id, text) VALUES (?, ?)"
+# 依 idx_violations_chat_created 由新到舊走訪，只取管理介面需要的欄位
+# 顯示名稱於寫入時決定，讀取時不必再關聯 users
+SQL_SELECT_RECENT_VIOLATIONS = """
+    SELECT id, user_id, display_name, matched_keyword, action_taken, created_at
+    FROM violations
+    WHERE chat_id = ?
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+SQL_SELECT_CHAT_SETTINGS = "SELECT * FROM chat_settings WHERE chat_id = ?"
+SQL_INSERT_CHAT_SETTINGS = """
+    INSERT INTO chat_settings (chat_id) VALUES (?)
+    ON CONFLICT(chat_id) DO NOTHING
+    RETURNING *
+"""
+
+# pending_verifications 只作為待驗證記錄的快照：啟動時載入，變更定期批次寫回
+SQL_SELECT_PENDING_SNAPSHOT = """
+    SELECT user_id, chat_id, message_id, expires_at FROM pending_verifications
+"""
+SQL_UPSERT_PENDING_SNAPSHOT = """
+    INSERT OR REPLACE INTO pending_verifications (user_id, chat_id, message_id, expires_at)
+    VALUES (?, ?, ?, ?)
+"""
+SQL_DELETE_PENDING_SNAPSHOT = """
+    DELETE FROM pending_verifications
+    WHERE user_id = ? AND chat_id = ?
+"""
+
+SQL_COUNT_VIOLATIONS = "SELECT COUNT(*) as count FROM violations"
+SQL_COUNT_CHAT_VIOLATIONS = "SELECT COUNT(*) as count FROM violations WHERE chat_id = ?"
+# created_at 為 UTC；以本地時間今日零時（換算為 UTC）作為範圍下限，才能使用索引
+SQL_START_OF_TODAY = "DATETIME('now', 'localtime', 'start of day', 'utc')"
+SQL_COUNT_VIOLATIONS_TODAY = f"""
+    SELECT COUNT(*) as count FROM violations
+    WHERE created_at >= {SQL_START_OF_TODAY}
+"""
+SQL_COUNT_CHAT_VIOLATIONS_TODAY = f"""
+    SELECT COUNT(*) as count FROM violations
+    WHERE chat_id = ? AND created_at >= {SQL_START_OF_TODAY}
+"""
+SQL_COUNT_USERS = "SELECT COUNT(*) as count FROM users"
+
+
+@dataclass(frozen=True, slots=True)
+class ChatSettings:
+    """群組設定（不可變，快取中的同一份物件可直接交給呼叫端）"""
+
+    chat_id: int
+    chat_title: Optional[str]
+    mute_duration: int
+    verification_timeout: int
+    notify_admins: bool
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ChatSettings":
+        """由資料表列建立，欄位為 NULL 時使用 config 的預設值"""
+        mute_duration = row.get("mute_duration")
+        verification_timeout = row.get("verification_timeout")
+        notify_admins = row.get("notify_admins")
+        return cls(
+            chat_id=row["chat_id"],
+            chat_title=row.get("chat_title"),
+            mute_duration=config.DEFAULT_MUTE_DURATION if mute_duration is None else mute_duration,
+            verification_timeout=(
+                config.VERIFICATION_TIMEOUT if verification_timeout is None else verification_timeout
+            ),
+            notify_admins=config.NOTIFY_ADMINS if notify_admins is None else bool(notify_admins),
+        )
+
 
 class Database:
     """異步資料庫操作類別"""
 
-    def __init__(self, db_path: str = "bot_data.db"):
+    def __init__(self, db_path: str = "bot_data.db", read_pool_size: int = READ_POOL_SIZE):
         self.db_path = Path(db_path)
+        # 寫入專用連線；純查詢則從唯讀連線池取得
         self._connection: Optional[aiosqlite.Connection] = None
+        self._read_pool_size = read_pool_size
+        self._readers: list[aiosqlite.Connection] = []
+        self._read_pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        # 寫入連線同一時間只有一個任務的交易；巢狀層數依任務各自記錄
+        self._transaction_lock = asyncio.Lock()
+        self._transaction_depth: contextvars.ContextVar[int] = contextvars.ContextVar(
+            f"transaction_depth_{id(self)}", default=0
+        )
+
+        # 讀多寫少的資料快取於記憶體（LRU），省去每則訊息的資料庫查詢
+        # chat_id -> (載入時間, 群組設定)
+        self._settings_cache: OrderedDict[int, tuple[float, ChatSettings]] = OrderedDict()
+        # 載入中的群組設定：同一群組的並行請求共用一次查詢，不同群組互不阻塞
+        self._settings_loading: dict[int, asyncio.Task] = {}
+
+        # 待驗證記錄只在數分鐘內有效，保存在記憶體中，加入洪峰時不產生磁碟 I/O
+        self._pending: dict[tuple[int, int], dict] = {}
+        # 尚未寫入快照的待驗證記錄（新增或移除）
+        self._pending_dirty: set[tuple[int, int]] = set()
+        self._pending_flusher: Optional[asyncio.Task] = None
+        # 通知定期寫入的背景任務停止（不以 cancel() 中斷進行中的寫入）
+        self._pending_stop = asyncio.Event()
 
     async def connect(self) -> None:
         """建立資料庫連接"""
-        self._connection = await aiosqlite.connect(self.db_path)
-        self._connection.row_factory = aiosqlite.Row
+        self._connection = await self._open_connection()
         await self._create_tables()
-        logger.info(f"Database connected: {self.db_path}")
+        await self._load_pending()
+        self._pending_stop.clear()
+        self._pending_flusher = asyncio.create_task(self._flush_pending_periodically())
+
+        # 資料表建立後才開啟唯讀連線
+        for _ in range(self._read_pool_size):
+            reader = await self._open_connection()
+            await reader.execute("PRAGMA query_only=1")
+            self._readers.append(reader)
+            self._read_pool.put_nowait(reader)
+
+        logger.info(f"Database connected: {self.db_path} ({len(self._readers)} readers)")
 
     async def close(self) -> None:
-        """關閉資料庫連接"""
-        if self._connection:
-            await self._connection.close()
-            self._connection = None
-            logger.info("Database connection closed")
+        """關閉資料庫連接（先寫入尚未儲存的待驗證記錄變更）"""
+        if self._pending_flusher:
+            # 等待進行中的寫入完成後再停止，不在寫入途中取消
+            self._pending_stop.set()
+            await self._pending_flusher
+            self._pending_flusher = None
+
+        try:
+            if self._connection:
+                await self.flush_pending()
+        finally:
+            # 最後一次寫入失敗時仍要關閉所有連線
+            for reader in self._readers:
+                await reader.close()
+            self._readers.clear()
+            self._read_pool = asyncio.Queue()
+
+            if self._connection:
+                await self._connection.close()
+                self._connection = None
+                logger.info("Database connection closed")
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        """開啟一條套用效能參數的連線"""
+        # 自動提交模式：單一語句各自提交，多個寫入以 transaction() 明確包成交易
+        # 不設定 row_factory：查詢結果為原生 tuple，只在需要欄位名稱處轉為 dict
+        connection = await aiosqlite.connect(self.db_path, isolation_level=None)
+        await self._apply_pragmas(connection)
+        return connection
+
+    @asynccontextmanager
+    async def _acquire_reader(self):
+        """從唯讀連線池取得連線；未設定連線池時使用寫入連線"""
+        if not self._readers:
+            yield self._connection
+            return
+
+        reader = await self._read_pool.get()
+        try:
+            yield reader
+        finally:
+            self._read_pool.put_nowait(reader)
+
+    async def _apply_pragmas(self, connection: aiosqlite.Connection) -> None:
+        """設定 SQLite 效能參數（WAL 模式，避免每次寫入都完整 fsync）"""
+        for pragma in (
+            "PRAGMA journal_mode=WAL",
+            "PRAGMA synchronous=NORMAL",
+            "PRAGMA cache_size=-8000",  # 約 8 MB 頁面快取
+            "PRAGMA temp_store=MEMORY",
+            "PRAGMA mmap_size=268435456",  # 256 MB
+            "PRAGMA journal_size_limit=6144000",
+            "PRAGMA busy_timeout=5000",
+        ):
+            await connection.execute(pragma)
 
     async def _create_tables(self) -> None:
         """建立資料表"""
-        async with self._connection.cursor() as cursor:
+        async with self.transaction(), self._connection.cursor() as cursor:
             # 用戶記錄表
             await cursor.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -56,6 +280,7 @@ class Database:
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     user_id INTEGER NOT NULL,
                     chat_id INTEGER NOT NULL,
+                    display_name TEXT,
                     message_text TEXT,
                     matched_keyword TEXT,
                     action_taken TEXT,
@@ -64,6 +289,28 @@ class Database:
                 )
             """)
 
+            # 舊版資料表沒有 display_name，補上欄位並以當時的用戶名稱回填
+            await cursor.execute("PRAGMA table_info(violations)")
+            columns = {row[1] for row in await cursor.fetchall()}
+            if "display_name" not in columns:
+                await cursor.execute("ALTER TABLE violations ADD COLUMN display_name TEXT")
+                await cursor.execute("""
+                    UPDATE violations
+                    SET display_name = COALESCE(
+                        (SELECT COALESCE(u.username, u.first_name)
+                         FROM users u WHERE u.user_id = violations.user_id),
+                        CAST(user_id AS TEXT)
+                    )
+                """)
+
+            # 違規訊息全文表（僅存放超過摘要長度的訊息）
+            await cursor.execute("""
+                CREATE TABLE IF NOT EXISTS violation_texts (
+                    violation_id INTEGER PRIMARY KEY REFERENCES violations(id),
+                    text TEXT NOT NULL
+                )
+            """)
+
             # 群組設定表
             await cursor.execute("""
                 CREATE TABLE IF NOT EXISTS chat_settings (
@@ -85,64 +332,149 @@ class Database:
                     chat_id INTEGER NOT NULL,
                     message_id INTEGER,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    expires_at TIMESTAMP NOT NULL,
+                    expires_at INTEGER NOT NULL,
                     UNIQUE(user_id, chat_id)
                 )
             """)
 
-            await self._connection.commit()
+            # 舊版以本地時間字串儲存 expires_at，轉換為 Unix 時間戳
+            await cursor.execute("""
+                UPDATE pending_verifications
+                SET expires_at = CAST(strftime('%s', expires_at, 'utc') AS INTEGER)
+                WHERE typeof(expires_at) = 'text'
+            """)
+
+            # 索引：最近違規記錄、統計與過期驗證查詢
+            await cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_violations_chat_created
+                ON violations(chat_id, created_at DESC)
+            """)
+            await cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_violations_created
+                ON violations(created_at)
+            """)
+            await cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_violations_user
+                ON violations(user_id)
+            """)
+            await cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pending_expires
+                ON pending_verifications(expires_at)
+            """)
+
             logger.info("Database tables created/verified")
 
+    # === 交易相關操作 ===
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        將區塊內的多個寫入合併為單一交易，只在最外層提交一次
+
+        同一任務內可巢狀使用；不同任務的交易以鎖依序執行，
+        不會誤入其他任務的交易，也不會提交或回滾其他任務的寫入
+        """
+        depth = self._transaction_depth.get()
+        if depth:
+            token = self._transaction_depth.set(depth + 1)
+            try:
+                yield
+            finally:
+                self._transaction_depth.reset(token)
+            return
+
+        async with self._transaction_lock:
+            await self._connection.execute("BEGIN IMMEDIATE")
+            token = self._transaction_depth.set(1)
+            try:
+                yield
+                await self._connection.commit()
+            except BaseException:
+                await self._connection.rollback()
+                # 快取可能含有已回滾的資料
+                self._settings_cache.clear()
+                raise
+            finally:
+                self._transaction_depth.reset(token)
+
+    @staticmethod
+    def _column_names(cursor: aiosqlite.Cursor) -> tuple[str, ...]:
+        """取得查詢結果的欄位名稱"""
+        return tuple(column[0] for column in cursor.description)
+
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key: int, value) -> None:
+        """寫入 LRU 快取，超過上限時移除最久未使用的項目"""
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > CACHE_MAX_SIZE:
+            cache.popitem(last=False)
+
     # === 用戶相關操作 ===
 
     async def get_or_create_user(
         self, user_id: int, username: str = None, first_name: str = None, last_name: str = None
     ) -> dict:
-        """取得或建立用戶記錄"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-            row = await cursor.fetchone()
-
-            if row:
-                return dict(row)
-
-            await cursor.execute(
-                """
-                INSERT INTO users (user_id, username, first_name, last_name)
-                VALUES (?, ?, ?, ?)
-                """,
-                (user_id, username, first_name, last_name),
-            )
-            await self._connection.commit()
+        """取得或建立用戶記錄（同時更新用戶名稱）"""
+        async with self.transaction():
+            async with self._connection.execute(
+                SQL_UPSERT_USER, (user_id, username, first_name, last_name)
+            ) as cursor:
+                row = await cursor.fetchone()
+                columns = self._column_names(cursor)
 
-            return {
-                "user_id": user_id,
-                "username": username,
-                "first_name": first_name,
-                "last_name": last_name,
-                "violation_count": 0,
-                "is_banned": 0,
-            }
+        return dict(zip(columns, row))
 
     async def increment_violation_count(self, user_id: int) -> int:
         """增加用戶違規次數"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                UPDATE users
-                SET violation_count = violation_count + 1, updated_at = ?
-                WHERE user_id = ?
-                """,
-                (datetime.now(), user_id),
+        async with self.transaction():
+            await self._connection.execute(
+                SQL_INCREMENT_VIOLATION_COUNT, (user_id,)
             )
-            await self._connection.commit()
 
-            await cursor.execute("SELECT violation_count FROM users WHERE user_id = ?", (user_id,))
-            row = await cursor.fetchone()
-            return row["violation_count"] if row else 0
+            async with self._connection.execute(SQL_SELECT_VIOLATION_COUNT, (user_id,)) as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row else 0
 
     # === 違規記錄相關操作 ===
 
+    async def record_violations(self, violations: list[dict]) -> None:
+        """
+        批次記錄多筆違規：更新用戶資料與違規次數並新增違規記錄，合併為單一交易
+
+        每筆為 dict，包含 add_violation 的參數（display_name 除外）與
+        username、first_name、last_name
+        """
+        users = []
+        rows = []
+        long_rows = []
+        for v in violations:
+            user_id = v["user_id"]
+            username = v.get("username")
+            first_name = v.get("first_name")
+            users.append((user_id, username, first_name, v.get("last_name")))
+
+            row, full_text = self._violation_row(
+                user_id,
+                v["chat_id"],
+                v["message_text"],
+                v["matched_keyword"],
+                v["action_taken"],
+                display_name=username or first_name,
+            )
+            if full_text is None:
+                rows.append(row)
+            else:
+                # 需要違規記錄 ID 才能另存全文，逐筆寫入
+                long_rows.append((row, full_text))
+
+        async with self.transaction():
+            await self._connection.executemany(SQL_UPSERT_USER_VIOLATION, users)
+            if rows:
+                await self._connection.executemany(SQL_INSERT_VIOLATION, rows)
+            for row, full_text in long_rows:
+                await self._insert_violation(row, full_text)
+
     async def add_violation(
         self,
         user_id: int,
@@ -150,18 +482,40 @@ class Database:
         message_text: str,
         matched_keyword: str,
         action_taken: str,
+        display_name: Optional[str] = None,
     ) -> int:
-        """新增違規記錄"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                INSERT INTO violations (user_id, chat_id, message_text, matched_keyword, action_taken)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (user_id, chat_id, message_text, matched_keyword, action_taken),
-            )
-            await self._connection.commit()
-            return cursor.lastrowid
+        """
+        新增違規記錄（較長的訊息全文另存於 violation_texts）
+
+        display_name 為統計列表顯示的名稱，未提供時使用 user_id
+        """
+        row, full_text = self._violation_row(
+            user_id, chat_id, message_text, matched_keyword, action_taken, display_name
+        )
+        async with self.transaction():
+            return await self._insert_violation(row, full_text)
+
+    @staticmethod
+    def _violation_row(
+        user_id: int,
+        chat_id: int,
+        message_text: str,
+        matched_keyword: str,
+        action_taken: str,
+        display_name: Optional[str] = None,
+    ) -> tuple[tuple, Optional[str]]:
+        """組成 violations 的一列，以及需另存於 violation_texts 的全文（不需另存時為 None）"""
+        excerpt = message_text[:VIOLATION_EXCERPT_LENGTH] if message_text else message_text
+        row = (user_id, chat_id, display_name or str(user_id), excerpt, matched_keyword, action_taken)
+        return row, (None if excerpt == message_text else message_text)
+
+    async def _insert_violation(self, row: tuple, full_text: Optional[str]) -> int:
+        """寫入一列違規記錄（需在交易內呼叫），回傳違規記錄 ID"""
+        async with self._connection.execute(SQL_INSERT_VIOLATION, row) as cursor:
+            violation_id = cursor.lastrowid
+        if full_text is not None:
+            await self._connection.execute(SQL_INSERT_VIOLATION_TEXT, (violation_id, full_text))
+        return violation_id
 
     async def get_violations_count(self, user_id: int = None, chat_id: int = None) -> int:
         """取得違規記錄數量"""
@@ -176,55 +530,69 @@ class Database:
             query += " AND chat_id = ?"
             params.append(chat_id)
 
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(query, params)
-            row = await cursor.fetchone()
-            return row["count"]
+        async with self._acquire_reader() as reader:
+            async with reader.execute(query, params) as cursor:
+                row = await cursor.fetchone()
+        return row[0]
 
     async def get_recent_violations(self, chat_id: int, limit: int = 10) -> list[dict]:
         """取得最近的違規記錄"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                SELECT v.*, u.username, u.first_name
-                FROM violations v
-                LEFT JOIN users u ON v.user_id = u.user_id
-                WHERE v.chat_id = ?
-                ORDER BY v.created_at DESC
-                LIMIT ?
-                """,
-                (chat_id, limit),
-            )
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        async with self._acquire_reader() as reader:
+            async with reader.execute(SQL_SELECT_RECENT_VIOLATIONS, (chat_id, limit)) as cursor:
+                rows = await cursor.fetchall()
+                columns = self._column_names(cursor)
+        return [dict(zip(columns, row)) for row in rows]
 
     # === 群組設定相關操作 ===
 
-    async def get_chat_settings(self, chat_id: int) -> dict:
-        """取得群組設定"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute("SELECT * FROM chat_settings WHERE chat_id = ?", (chat_id,))
+    async def get_chat_settings(self, chat_id: int) -> ChatSettings:
+        """取得群組設定（優先使用快取）"""
+        cached = self._settings_cache.get(chat_id)
+        if cached is not None and time.monotonic() - cached[0] < SETTINGS_CACHE_TTL:
+            self._settings_cache.move_to_end(chat_id)
+            return cached[1]
+
+        task = self._settings_loading.get(chat_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_chat_settings(chat_id))
+            self._settings_loading[chat_id] = task
+        # shield：單一請求被取消時不影響其他等待同一次查詢的請求
+        return await asyncio.shield(task)
+
+    async def _fetch_chat_settings(self, chat_id: int) -> ChatSettings:
+        """載入群組設定並寫入快取"""
+        task = asyncio.current_task()
+        try:
+            settings = await self._load_chat_settings(chat_id)
+            # 載入期間設定已被更新時，不以舊資料覆蓋快取
+            if self._settings_loading.get(chat_id) is task:
+                self._cache_put(self._settings_cache, chat_id, (time.monotonic(), settings))
+            return settings
+        finally:
+            if self._settings_loading.get(chat_id) is task:
+                del self._settings_loading[chat_id]
+
+    async def _load_chat_settings(self, chat_id: int) -> ChatSettings:
+        """從資料庫讀取群組設定，不存在時以預設值建立"""
+        async with self._connection.execute(SQL_SELECT_CHAT_SETTINGS, (chat_id,)) as cursor:
             row = await cursor.fetchone()
+            columns = self._column_names(cursor)
 
-            if row:
-                return dict(row)
+        if row:
+            return ChatSettings.from_row(dict(zip(columns, row)))
 
-            # 使用預設值建立記錄
-            await cursor.execute(
-                """
-                INSERT INTO chat_settings (chat_id)
-                VALUES (?)
-                """,
-                (chat_id,),
-            )
-            await self._connection.commit()
+        # 使用預設值建立記錄，直接取回含預設值的整列
+        async with self.transaction():
+            async with self._connection.execute(SQL_INSERT_CHAT_SETTINGS, (chat_id,)) as cursor:
+                row = await cursor.fetchone()
+                columns = self._column_names(cursor)
 
-            return {
-                "chat_id": chat_id,
-                "mute_duration": 86400,
-                "verification_timeout": 300,
-                "notify_admins": 1,
-            }
+            if row is None:
+                # 其他協程已搶先建立
+                async with self._connection.execute(SQL_SELECT_CHAT_SETTINGS, (chat_id,)) as cursor:
+                    row = await cursor.fetchone()
+                    columns = self._column_names(cursor)
+        return ChatSettings.from_row(dict(zip(columns, row)))
 
     async def update_chat_settings(self, chat_id: int, **kwargs) -> None:
         """更新群組設定"""
@@ -232,142 +600,281 @@ class Database:
             return
 
         set_clause = ", ".join(f"{key} = ?" for key in kwargs.keys())
-        values = list(kwargs.values()) + [datetime.now(), chat_id]
+        values = list(kwargs.values()) + [chat_id]
 
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
+        async with self.transaction():
+            await self._connection.execute(
                 f"""
                 UPDATE chat_settings
-                SET {set_clause}, updated_at = ?
+                SET {set_clause}, updated_at = CURRENT_TIMESTAMP
                 WHERE chat_id = ?
                 """,
                 values,
             )
-            await self._connection.commit()
+        self._settings_cache.pop(chat_id, None)
+        self._settings_loading.pop(chat_id, None)
 
     # === 待驗證成員相關操作 ===
 
+    async def _load_pending(self) -> None:
+        """從快照載入上次關閉時仍待驗證的記錄"""
+        async with self._connection.execute(SQL_SELECT_PENDING_SNAPSHOT) as cursor:
+            rows = await cursor.fetchall()
+            columns = self._column_names(cursor)
+
+        self._pending = {}
+        for row in rows:
+            record = dict(zip(columns, row))
+            self._pending[(record["user_id"], record["chat_id"])] = record
+
+        if self._pending:
+            logger.info(f"Restored {len(self._pending)} pending verifications")
+
+    async def flush_pending(self) -> None:
+        """將累積的待驗證記錄變更以單一交易寫入快照，供重新啟動後還原"""
+        if not self._pending_dirty:
+            return
+
+        dirty, self._pending_dirty = self._pending_dirty, set()
+        upserts = []
+        deletes = []
+        for key in dirty:
+            record = self._pending.get(key)
+            if record is None:
+                deletes.append(key)
+            else:
+                upserts.append(
+                    (record["user_id"], record["chat_id"], record["message_id"], record["expires_at"])
+                )
+
+        try:
+            async with self.transaction():
+                if deletes:
+                    await self._connection.executemany(SQL_DELETE_PENDING_SNAPSHOT, deletes)
+                if upserts:
+                    await self._connection.executemany(SQL_UPSERT_PENDING_SNAPSHOT, upserts)
+        except BaseException:
+            # 寫入失敗或被取消時保留變更，下次再試
+            self._pending_dirty |= dirty
+            raise
+
+    async def _flush_pending_periodically(self) -> None:
+        """背景任務：定期將待驗證記錄的變更批次寫入快照，直到收到停止通知"""
+        while True:
+            try:
+                await asyncio.wait_for(self._pending_stop.wait(), timeout=PENDING_FLUSH_INTERVAL)
+                # 最後一次寫入由 close() 負責
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush_pending()
+            except Exception as e:
+                logger.error(f"Failed to flush pending verifications: {e}")
+
     async def add_pending_verification(
-        self, user_id: int, chat_id: int, message_id: int, expires_at: datetime
+        self, user_id: int, chat_id: int, message_id: int, expires_at: int
     ) -> None:
-        """新增待驗證成員"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                INSERT OR REPLACE INTO pending_verifications (user_id, chat_id, message_id, expires_at)
-                VALUES (?, ?, ?, ?)
-                """,
-                (user_id, chat_id, message_id, expires_at),
-            )
-            await self._connection.commit()
+        """新增待驗證成員（expires_at 為 Unix 時間戳）"""
+        self._pending[(user_id, chat_id)] = {
+            "user_id": user_id,
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "expires_at": expires_at,
+        }
+        self._pending_dirty.add((user_id, chat_id))
+
+    async def get_pending_verifications(self) -> list[dict]:
+        """取得所有待驗證記錄"""
+        return [dict(record) for record in self._pending.values()]
 
     async def get_pending_verification(self, user_id: int, chat_id: int) -> Optional[dict]:
         """取得待驗證記錄"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                SELECT * FROM pending_verifications
-                WHERE user_id = ? AND chat_id = ?
-                """,
-                (user_id, chat_id),
-            )
-            row = await cursor.fetchone()
-            return dict(row) if row else None
+        record = self._pending.get((user_id, chat_id))
+        return dict(record) if record else None
 
     async def remove_pending_verification(self, user_id: int, chat_id: int) -> bool:
         """移除待驗證記錄"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                DELETE FROM pending_verifications
-                WHERE user_id = ? AND chat_id = ?
-                """,
-                (user_id, chat_id),
-            )
-            await self._connection.commit()
-            return cursor.rowcount > 0
-
-    async def get_expired_verifications(self) -> list[dict]:
-        """取得所有過期的驗證"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                SELECT * FROM pending_verifications
-                WHERE expires_at < ?
-                """,
-                (datetime.now(),),
-            )
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
-
-    async def clear_expired_verifications(self) -> int:
-        """清除過期的驗證記錄"""
-        async with self._connection.cursor() as cursor:
-            await cursor.execute(
-                """
-                DELETE FROM pending_verifications
-                WHERE expires_at < ?
-                """,
-                (datetime.now(),),
-            )
-            await self._connection.commit()
-            return cursor.rowcount
+        if self._pending.pop((user_id, chat_id), None) is None:
+            return False
+        self._pending_dirty.add((user_id, chat_id))
+        return True
+
+    async def sweep_expired(self) -> list[dict]:
+        """一次移除所有過期的驗證，並回傳被移除的記錄"""
+        now = int(time.time())
+        expired_keys = [key for key, r in self._pending.items() if r["expires_at"] <= now]
+        self._pending_dirty.update(expired_keys)
+        return [self._pending.pop(key) for key in expired_keys]
 
     # === 統計相關操作 ===
 
+    @staticmethod
+    async def _fetch_count(
+        connection: aiosqlite.Connection, query: str, params: tuple = ()
+    ) -> int:
+        """執行 COUNT 查詢並回傳結果"""
+        async with connection.execute(query, params) as cursor:
+            row = await cursor.fetchone()
+        return row[0]
+
     async def get_stats(self, chat_id: int = None) -> dict:
         """取得統計資料"""
         stats = {}
 
-        async with self._connection.cursor() as cursor:
-            # 總違規次數
+        async with self._acquire_reader() as reader:
             if chat_id:
-                await cursor.execute(
-                    "SELECT COUNT(*) as count FROM violations WHERE chat_id = ?", (chat_id,)
+                stats["total_violations"] = await self._fetch_count(
+                    reader, SQL_COUNT_CHAT_VIOLATIONS, (chat_id,)
                 )
-            else:
-                await cursor.execute("SELECT COUNT(*) as count FROM violations")
-            row = await cursor.fetchone()
-            stats["total_violations"] = row["count"]
-
-            # 今日違規次數
-            today = datetime.now().strftime("%Y-%m-%d")
-            if chat_id:
-                await cursor.execute(
-                    """
-                    SELECT COUNT(*) as count FROM violations
-                    WHERE chat_id = ? AND DATE(created_at) = ?
-                    """,
-                    (chat_id, today),
+                stats["today_violations"] = await self._fetch_count(
+                    reader, SQL_COUNT_CHAT_VIOLATIONS_TODAY, (chat_id,)
                 )
             else:
-                await cursor.execute(
-                    "SELECT COUNT(*) as count FROM violations WHERE DATE(created_at) = ?",
-                    (today,),
+                stats["total_violations"] = await self._fetch_count(reader, SQL_COUNT_VIOLATIONS)
+                stats["today_violations"] = await self._fetch_count(
+                    reader, SQL_COUNT_VIOLATIONS_TODAY
                 )
-            row = await cursor.fetchone()
-            stats["today_violations"] = row["count"]
 
             # 總用戶數
-            await cursor.execute("SELECT COUNT(*) as count FROM users")
-            row = await cursor.fetchone()
-            stats["total_users"] = row["count"]
+            stats["total_users"] = await self._fetch_count(reader, SQL_COUNT_USERS)
 
-            # 待驗證人數
-            if chat_id:
-                await cursor.execute(
-                    """
-                    SELECT COUNT(*) as count FROM pending_verifications
-                    WHERE chat_id = ? AND expires_at > ?
-                    """,
-                    (chat_id, datetime.now()),
-                )
-            else:
-                await cursor.execute(
-                    "SELECT COUNT(*) as count FROM pending_verifications WHERE expires_at > ?",
-                    (datetime.now(),),
-                )
-            row = await cursor.fetchone()
-            stats["pending_verifications"] = row["count"]
+        # 待驗證人數
+        now = int(time.time())
+        stats["pending_verifications"] = sum(
+            1
+            for r in self._pending.values()
+            if r["expires_at"] > now and (not chat_id or r["chat_id"] == chat_id)
+        )
 
         return stats
+
+
+class ViolationWriter:
+    """
+    違規記錄批次寫入器
+
+    洗版時違規記錄先放入佇列，由背景任務每收集一批（或等待逾時）以單一交易寫入，
+    取代每則違規各自一次交易
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        batch_size: int = VIOLATION_BATCH_SIZE,
+        interval: float = VIOLATION_BATCH_INTERVAL,
+    ):
+        self._db = db
+        self._batch_size = batch_size
+        self._interval = interval
+        # 元素為違規記錄 dict；None 表示停止
+        self._queue: asyncio.Queue[Optional[dict]] = asyncio.Queue(maxsize=VIOLATION_QUEUE_SIZE)
+        self._task: Optional[asyncio.Task] = None
+        # 關閉中時不再無限重試，避免資料庫故障讓關閉程序卡住
+        self._closing = False
+
+    def start(self) -> None:
+        """啟動背景寫入任務"""
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """寫入佇列中剩餘的記錄後停止"""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def put(
+        self,
+        user_id: int,
+        chat_id: int,
+        message_text: str,
+        matched_keyword: str,
+        action_taken: str,
+        username: str = None,
+        first_name: str = None,
+        last_name: str = None,
+    ) -> None:
+        """
+        加入一筆違規記錄（欄位見 Database.record_violations）
+
+        不等待：資料庫長時間故障導致佇列已滿時，記錄後捨棄新記錄，
+        避免處理訊息的協程卡在寫入上
+        """
+        try:
+            self._queue.put_nowait({
+                "user_id": user_id,
+                "chat_id": chat_id,
+                "message_text": message_text,
+                "matched_keyword": matched_keyword,
+                "action_taken": action_taken,
+                "username": username,
+                "first_name": first_name,
+                "last_name": last_name,
+            })
+        except asyncio.QueueFull:
+            logger.warning(
+                "Violation queue full, dropping record for user %s in chat %s", user_id, chat_id
+            )
+
+    async def _run(self) -> None:
+        """背景任務：收集一批記錄後寫入，直到收到停止訊號"""
+        loop = asyncio.get_running_loop()
+        while True:
+            violation = await self._queue.get()
+            if violation is None:
+                return
+
+            batch = [violation]
+            stopping = False
+            deadline = loop.time() + self._interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    violation = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if violation is None:
+                    stopping = True
+                    break
+                batch.append(violation)
+
+            if not await self._write(batch) or stopping:
+                return
+
+    async def _write(self, batch: list[dict]) -> bool:
+        """
+        寫入一批記錄；失敗時保留整批，以遞增的間隔重試直到成功
+
+        重試期間不再從佇列取出新記錄，佇列滿時新記錄由 put() 捨棄；
+        關閉期間仍失敗時放棄本批與佇列中剩餘的記錄並回傳 False，避免關閉程序卡住
+        """
+        delay = VIOLATION_RETRY_DELAY
+        attempts = 0
+        while True:
+            try:
+                await self._db.record_violations(batch)
+                return True
+            except Exception as e:
+                attempts += 1
+                if self._closing and attempts >= VIOLATION_SHUTDOWN_ATTEMPTS:
+                    dropped = len(batch)
+                    while not self._queue.empty():
+                        if self._queue.get_nowait() is not None:
+                            dropped += 1
+                    logger.error(
+                        "Failed to write violations during shutdown after %s attempts, "
+                        "dropping %s records: %s",
+                        attempts, dropped, e,
+                    )
+                    return False
+                logger.warning(
+                    "Failed to write %s violations (attempt %s), retrying in %ss: %s",
+                    len(batch), attempts, delay, e,
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, VIOLATION_RETRY_MAX_DELAY)
@@ -6,8 +6,13 @@
 - 繁簡體轉換
 """
 
+import os
 import re
+import asyncio
+import bisect
 import logging
+import pickle
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -17,8 +22,26 @@ try:
 except ImportError:
     HAS_OPENCC = False
 
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 logger = logging.getLogger(__name__)
 
+# 關鍵字數量不超過此值時直接逐一比對，省去建立自動機的開銷
+AUTOMATON_MIN_KEYWORDS = 16
+
+# 關鍵字變更後延遲寫回檔案的秒數，期間的多次變更合併為一次寫入
+KEYWORDS_FLUSH_DELAY = 2.0
+
+# 中日韓漢字（含擴充區與相容字），不含漢字的文字不需做繁簡轉換
+CJK_PATTERN = re.compile(r"[\u3400-\u9fff\uf900-\ufaff\U00020000-\U0003134f]")
+
+# 編譯產物快取格式版本，格式變更時遞增以捨棄舊檔
+ARTIFACT_VERSION = 2
+
 
 class SpamFilter:
     """垃圾訊息過濾器"""
@@ -26,7 +49,30 @@ class SpamFilter:
     def __init__(self, keywords_file: str = "keywords.txt"):
         self.keywords_file = Path(keywords_file)
         self.keywords: set[str] = set()
+        # 與 keywords 同步維護的排序列表，列出關鍵字時不必重新排序
+        self._keywords_sorted: list[str] = []
         self.regex_patterns: list[re.Pattern] = []
+        # 關鍵字或正則表達式每次變更時遞增，供外部判斷快取是否過期
+        self.version = 0
+        # 關鍵字檔案的 (mtime, size)，未變更時略過重新載入
+        self._kwfile_signature: Optional[tuple[int, int]] = None
+        # 編譯產物快取（關鍵字變體與自動機），關鍵字檔案未變更時直接載入
+        self._artifact_path = self.keywords_file.with_suffix(".pkl")
+        # 記憶體中有尚未寫回檔案的關鍵字變更
+        self._dirty = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # 關鍵字 -> 其繁簡變體（OpenCC 轉換結果）
+        self._keyword_forms: dict[str, tuple[str, ...]] = {}
+        # 關鍵字的繁簡變體 -> 原始關鍵字
+        self._keyword_variants: dict[str, str] = {}
+        self._automaton = None
+        # 未安裝 pyahocorasick 時，由關鍵字變體合併而成的正則表達式
+        self._keyword_regex: Optional[re.Pattern] = None
+        # 合併後的正則表達式，第 i 個分組對應 _merged_patterns[i - 1]
+        self._merged_regex: Optional[re.Pattern] = None
+        self._merged_patterns: list[re.Pattern] = []
+        # 含有捕獲分組（可能有反向參照）而無法合併的正則表達式
+        self._standalone_patterns: list[re.Pattern] = []
 
         # 繁簡轉換器
         if HAS_OPENCC:
@@ -37,15 +83,44 @@ class SpamFilter:
             self.s2t = None
             logger.warning("OpenCC not installed, traditional/simplified conversion disabled")
 
+        # 洗版訊息常重複出現，快取繁簡轉換結果
+        self._normalize_text = lru_cache(maxsize=1024)(self._normalize_text)
+
+        if not HAS_AHOCORASICK:
+            logger.warning("pyahocorasick not installed, falling back to merged regex matching")
+
         self.load_keywords()
 
-    def load_keywords(self) -> None:
-        """從檔案載入關鍵字"""
+    def load_keywords(self, force: bool = False) -> None:
+        """從檔案載入關鍵字（檔案未變更時略過，除非 force）"""
+        # 先寫回尚未儲存的變更，避免被檔案內容覆蓋
+        if self._dirty:
+            self.flush()
+
+        signature = self._file_signature()
+        if not force and signature is not None and signature == self._kwfile_signature:
+            logger.info("Keywords file unchanged, skipping reload")
+            return
+
+        self.version += 1
+        if signature is not None and self._load_artifact(signature):
+            self._kwfile_signature = signature
+            logger.info(
+                f"Loaded {len(self.keywords)} keywords and {len(self.regex_patterns)} regex patterns "
+                f"from cache"
+            )
+            return
+
         self.keywords.clear()
+        self._keywords_sorted.clear()
         self.regex_patterns.clear()
+        self._keyword_forms.clear()
+        self._kwfile_signature = signature
 
-        if not self.keywords_file.exists():
+        if signature is None:
             logger.warning(f"Keywords file not found: {self.keywords_file}")
+            self._build_keyword_matcher()
+            self._build_merged_regex()
             return
 
         with open(self.keywords_file, "r", encoding="utf-8") as f:
@@ -58,7 +133,7 @@ class SpamFilter:
                 if line.startswith("regex:"):
                     pattern = line[6:].strip()
                     try:
-                        self.regex_patterns.append(re.compile(pattern, re.IGNORECASE))
+                        self.regex_patterns.append(self._compile_pattern(pattern))
                         logger.debug(f"Added regex pattern: {pattern}")
                     except re.error as e:
                         logger.error(f"Invalid regex pattern '{pattern}': {e}")
@@ -67,6 +142,10 @@ class SpamFilter:
                     self.keywords.add(line.lower())
                     logger.debug(f"Added keyword: {line}")
 
+        self._keywords_sorted = sorted(self.keywords)
+        self._build_keyword_matcher()
+        self._build_merged_regex()
+        self._save_artifact()
         logger.info(f"Loaded {len(self.keywords)} keywords and {len(self.regex_patterns)} regex patterns")
 
     def add_keyword(self, keyword: str) -> bool:
@@ -76,10 +155,10 @@ class SpamFilter:
             return False
 
         self.keywords.add(keyword_lower)
-
-        # 寫入檔案
-        with open(self.keywords_file, "a", encoding="utf-8") as f:
-            f.write(f"\n{keyword}")
+        self.version += 1
+        bisect.insort(self._keywords_sorted, keyword_lower)
+        self._add_to_keyword_matcher(keyword_lower)
+        self._schedule_flush()
 
         logger.info(f"Added keyword: {keyword}")
         return True
@@ -91,16 +170,53 @@ class SpamFilter:
             return False
 
         self.keywords.discard(keyword_lower)
-
-        # 重寫檔案
-        self._save_keywords()
+        self.version += 1
+        index = bisect.bisect_left(self._keywords_sorted, keyword_lower)
+        del self._keywords_sorted[index]
+        self._keyword_forms.pop(keyword_lower, None)
+        self._build_keyword_matcher()
+        self._schedule_flush()
 
         logger.info(f"Removed keyword: {keyword}")
         return True
 
+    def _schedule_flush(self) -> None:
+        """標記有未儲存的變更，並排程延遲寫回檔案"""
+        self._dirty = True
+        if self._flush_handle is not None:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件迴圈中（例如命令列工具），直接寫入
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(KEYWORDS_FLUSH_DELAY, self.flush)
+
+    def flush(self) -> None:
+        """將尚未儲存的關鍵字變更寫回檔案"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._dirty:
+            return
+
+        try:
+            self._save_keywords()
+        except OSError as e:
+            logger.error(f"Failed to save keywords file {self.keywords_file}: {e}")
+            return
+
+        self._dirty = False
+        self._kwfile_signature = self._file_signature()
+        self._save_artifact()
+
     def _save_keywords(self) -> None:
-        """將關鍵字寫入檔案"""
-        with open(self.keywords_file, "w", encoding="utf-8") as f:
+        """將關鍵字寫入暫存檔，再以 os.replace 原子替換原檔案"""
+        tmp_path = self.keywords_file.with_name(f"{self.keywords_file.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
             f.write("# 敏感關鍵字列表\n")
             f.write("# 每行一個關鍵字，以 # 開頭的行為註解\n")
             f.write("# 正則表達式以 regex: 開頭\n\n")
@@ -110,39 +226,204 @@ class SpamFilter:
                 f.write(f"regex:{pattern.pattern}\n")
 
             # 再寫入一般關鍵字
-            for keyword in sorted(self.keywords):
+            for keyword in self._keywords_sorted:
                 f.write(f"{keyword}\n")
 
+        os.replace(tmp_path, self.keywords_file)
+
+    def _file_signature(self) -> Optional[tuple[int, int]]:
+        """取得關鍵字檔案的 (mtime, size)，檔案不存在時回傳 None"""
+        try:
+            stat = self.keywords_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_artifact(self, signature: tuple[int, int]) -> bool:
+        """若快取檔案對應目前的關鍵字檔案，直接載入編譯產物"""
+        try:
+            with open(self._artifact_path, "rb") as f:
+                artifact = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Failed to load keyword cache {self._artifact_path}: {e}")
+            return False
+
+        if artifact.get("key") != self._artifact_key(signature):
+            return False
+
+        self.keywords = artifact["keywords"]
+        self._keywords_sorted = artifact["keywords_sorted"]
+        self.regex_patterns = [self._compile_pattern(p) for p in artifact["regex_sources"]]
+        self._keyword_forms = artifact["keyword_forms"]
+        self._keyword_variants = artifact["keyword_variants"]
+        self._automaton = artifact["automaton"]
+        self._build_keyword_regex()
+        self._build_merged_regex()
+        return True
+
+    def _save_artifact(self) -> None:
+        """將編譯產物寫入快取檔案，供下次啟動直接載入"""
+        if self._kwfile_signature is None:
+            return
+
+        artifact = {
+            "key": self._artifact_key(self._kwfile_signature),
+            "keywords": self.keywords,
+            "keywords_sorted": self._keywords_sorted,
+            "regex_sources": [p.pattern for p in self.regex_patterns],
+            "keyword_forms": self._keyword_forms,
+            "keyword_variants": self._keyword_variants,
+            "automaton": self._automaton,
+        }
+        try:
+            with open(self._artifact_path, "wb") as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning(f"Failed to save keyword cache {self._artifact_path}: {e}")
+
+    @staticmethod
+    def _artifact_key(signature: tuple[int, int]) -> tuple:
+        """快取有效條件：格式版本、關鍵字檔案、可用的選用套件"""
+        return (ARTIFACT_VERSION, signature, HAS_OPENCC, HAS_AHOCORASICK)
+
+    def _keyword_forms_of(self, keyword: str) -> tuple[str, ...]:
+        """取得關鍵字的繁簡變體（已轉換過的直接沿用）"""
+        forms = self._keyword_forms.get(keyword)
+        if forms is None:
+            forms = (keyword,)
+            if self.t2s and self.s2t:
+                forms += (self.t2s.convert(keyword).lower(), self.s2t.convert(keyword).lower())
+            self._keyword_forms[keyword] = forms
+        return forms
+
+    def _build_keyword_matcher(self) -> None:
+        """
+        預先展開每個關鍵字的繁簡變體，並建立 Aho–Corasick 自動機
+
+        比對時只需掃描原文一次，不必對每則訊息做繁簡轉換
+        """
+        variants: dict[str, str] = {}
+        for keyword in self.keywords:
+            if not keyword:
+                continue
+            for form in self._keyword_forms_of(keyword):
+                variants.setdefault(form, keyword)
+        self._keyword_variants = variants
+        self._build_automaton()
+
+    def _add_to_keyword_matcher(self, keyword: str) -> None:
+        """將單一關鍵字加入既有的比對結構，不重建其他關鍵字"""
+        if not keyword:
+            return
+
+        new_forms = [
+            form for form in self._keyword_forms_of(keyword)
+            if form not in self._keyword_variants
+        ]
+        for form in new_forms:
+            self._keyword_variants[form] = keyword
+
+        if self._automaton is None:
+            self._build_automaton()
+            return
+
+        for form in new_forms:
+            self._automaton.add_word(form, keyword)
+        self._automaton.make_automaton()
+
+    def _build_automaton(self) -> None:
+        """由關鍵字變體建立 Aho–Corasick 自動機（關鍵字少時不建立）"""
+        self._build_keyword_regex()
+        if not HAS_AHOCORASICK or len(self._keyword_variants) <= AUTOMATON_MIN_KEYWORDS:
+            self._automaton = None
+            return
+
+        automaton = ahocorasick.Automaton()
+        for variant, keyword in self._keyword_variants.items():
+            automaton.add_word(variant, keyword)
+        automaton.make_automaton()
+        self._automaton = automaton
+
+    def _build_keyword_regex(self) -> None:
+        """未安裝 pyahocorasick 時，將關鍵字變體合併為單一正則表達式，一次掃描即可"""
+        self._keyword_regex = None
+        if HAS_AHOCORASICK or len(self._keyword_variants) <= AUTOMATON_MIN_KEYWORDS:
+            return
+
+        # 較長的變體排在前面，同一位置重疊時比對到較完整的關鍵字
+        self._keyword_regex = re.compile(
+            "|".join(
+                re.escape(variant)
+                for variant in sorted(self._keyword_variants, key=len, reverse=True)
+            )
+        )
+
+    @staticmethod
+    def _compile_pattern(pattern: str) -> re.Pattern:
+        """
+        編譯正則表達式（忽略大小寫）
+
+        比對的文字雖已轉為小寫，樣式仍可能以跳脫序列（如 \\x41、\\u0041）寫出大寫字母，
+        一律忽略大小寫才不會漏判
+        """
+        return re.compile(pattern, re.IGNORECASE)
+
+    def _build_merged_regex(self) -> None:
+        """將所有正則表達式合併為單一樣式，比對時只需掃描一次"""
+        mergeable = [p for p in self.regex_patterns if p.groups == 0]
+        self._standalone_patterns = [p for p in self.regex_patterns if p.groups > 0]
+        self._merged_regex = None
+        self._merged_patterns = []
+
+        if not mergeable:
+            return
+
+        try:
+            self._merged_regex = re.compile(
+                "|".join(f"({p.pattern})" for p in mergeable), re.IGNORECASE
+            )
+            self._merged_patterns = mergeable
+        except re.error as e:
+            # 例如樣式中間含有全域旗標，改為逐一比對
+            logger.warning(f"Failed to merge regex patterns, matching individually: {e}")
+            self._standalone_patterns = list(self.regex_patterns)
+
     def get_keywords(self) -> list[str]:
         """取得所有關鍵字"""
-        return sorted(list(self.keywords))
+        return list(self._keywords_sorted)
 
-    def _normalize_text(self, text: str) -> list[str]:
+    def _normalize_text(self, lowered: str) -> tuple[str, ...]:
         """
-        正規化文字，回傳多個變體以供比對
+        由已轉小寫的文字產生多個變體以供正則表達式比對
         包含：原始文字、簡體、繁體
         """
-        variants = [text.lower()]
+        variants = [lowered]
+
+        # 純英數、網址等不含漢字的文字，繁簡轉換結果與原文相同
+        if lowered.isascii() or not CJK_PATTERN.search(lowered):
+            return tuple(variants)
 
         if self.t2s and self.s2t:
-            # 轉換為簡體
-            simplified = self.t2s.convert(text).lower()
+            # 繁簡轉換不影響大小寫，不必再各自 lower()
+            simplified = self.t2s.convert(lowered)
             if simplified not in variants:
                 variants.append(simplified)
 
-            # 轉換為繁體
-            traditional = self.s2t.convert(text).lower()
+            traditional = self.s2t.convert(lowered)
             if traditional not in variants:
                 variants.append(traditional)
 
-        return variants
+        return tuple(variants)
 
-    def check_message(self, text: str) -> Optional[str]:
+    def check_message(self, text: str, lowered: Optional[str] = None) -> Optional[str]:
         """
         檢查訊息是否包含敏感關鍵字
 
         Args:
             text: 要檢查的訊息文字
+            lowered: 已轉為小寫的訊息文字（呼叫端已計算時傳入，省去重複轉換）
 
         Returns:
             如果找到敏感關鍵字，回傳該關鍵字；否則回傳 None
@@ -150,23 +431,52 @@ class SpamFilter:
         if not text:
             return None
 
-        # 取得文字變體
-        text_variants = self._normalize_text(text)
+        # 檢查一般關鍵字（變體已預先展開，自動機一次線性掃描即可）
+        if lowered is None:
+            lowered = text.lower()
+        keyword = self._match_keyword(lowered)
+        if keyword:
+            return keyword
 
-        # 檢查一般關鍵字
-        for variant in text_variants:
-            for keyword in self.keywords:
-                if keyword in variant:
-                    return keyword
+        # 取得文字變體（共用同一份小寫文字；不含漢字時只有原文）
+        text_variants = self._normalize_text(lowered)
 
-        # 檢查正則表達式
-        for pattern in self.regex_patterns:
-            for variant in text_variants:
+        # 繁簡混用的文字與關鍵字的全繁、全簡形式都不相符，轉換後再比對一次
+        for variant in text_variants[1:]:
+            keyword = self._match_keyword(variant)
+            if keyword:
+                return keyword
+
+        if not self.regex_patterns:
+            return None
+
+        # 檢查正則表達式（合併後的樣式一次掃描即可）
+        for variant in text_variants:
+            if self._merged_regex is not None:
+                match = self._merged_regex.search(variant)
+                if match:
+                    return f"regex:{self._merged_patterns[match.lastindex - 1].pattern}"
+            for pattern in self._standalone_patterns:
                 if pattern.search(variant):
                     return f"regex:{pattern.pattern}"
 
         return None
 
+    def _match_keyword(self, lowered: str) -> Optional[str]:
+        """以關鍵字比對結構掃描已轉小寫的文字，回傳第一個命中的關鍵字"""
+        if self._automaton is not None:
+            for _, keyword in self._automaton.iter(lowered):
+                return keyword
+        elif self._keyword_regex is not None:
+            match = self._keyword_regex.search(lowered)
+            if match:
+                return self._keyword_variants[match.group()]
+        else:
+            for variant, keyword in self._keyword_variants.items():
+                if variant in lowered:
+                    return keyword
+        return None
+
     def is_spam(self, text: str) -> bool:
         """檢查訊息是否為垃圾訊息"""
         return self.check_message(text) is not None
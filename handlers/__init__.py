@@ -2,12 +2,14 @@
 Handlers 模組
 """
 
-from .message import setup_message_handlers
-from .member import setup_member_handlers
+from .message import setup_message_handlers, NotificationBatcher
+from .member import setup_member_handlers, VerificationExpiryScheduler
 from .admin import setup_admin_handlers
 
 __all__ = [
     "setup_message_handlers",
     "setup_member_handlers",
     "setup_admin_handlers",
+    "VerificationExpiryScheduler",
+    "NotificationBatcher",
 ]
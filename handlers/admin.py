@@ -2,8 +2,15 @@
 管理員指令處理模組
 """
 
+import asyncio
+import functools
 import logging
-from telegram import Update, ChatPermissions
+import time
+import weakref
+from collections import OrderedDict
+from typing import Optional
+
+from telegram import Message, Update, ChatPermissions
 from telegram.ext import ContextTypes, CommandHandler
 from telegram.error import TelegramError
 
@@ -13,33 +20,207 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# 管理員名單快取的有效秒數與最多快取的群組數
+ADMIN_CACHE_TTL = 60
+ADMIN_CACHE_MAX_SIZE = 1024
+
+# chat_id -> (查詢時間, 管理員 ID 集合)，每個群組每段 TTL 只需一次 get_administrators 呼叫
+_admin_cache: OrderedDict[int, tuple[float, frozenset[int]]] = OrderedDict()
+# 查詢中的管理員名單：同一群組的並行檢查共用一次 get_administrators 呼叫
+_admin_inflight: dict[int, asyncio.Task] = {}
+
+# 解除禁言時恢復的成員權限
+FULL_PERMISSIONS = ChatPermissions(
+    can_send_messages=True,
+    can_send_audios=True,
+    can_send_documents=True,
+    can_send_photos=True,
+    can_send_videos=True,
+    can_send_video_notes=True,
+    can_send_voice_notes=True,
+    can_send_polls=True,
+    can_send_other_messages=True,
+    can_add_web_page_previews=True,
+    can_invite_users=True,
+)
+
+# 關鍵字列表每頁筆數
+KEYWORDS_PAGE_SIZE = 50
+
+# (SpamFilter.version, 各頁內容)，關鍵字未變更時直接取用已組好的頁面
+_keyword_pages: tuple[int, list[str]] = (-1, [])
+
+# 固定的回覆內容
+_HELP_TEXT = """
+🧹 SweepMonk 掃地僧 - Group Guardian
 
-async def is_admin(update: Update) -> bool:
-    """檢查用戶是否為管理員"""
+📝 關鍵字管理 Keyword Management:
+• /addkeyword <詞> - 新增關鍵字 Add keyword
+• /delkeyword <詞> - 刪除關鍵字 Delete keyword
+• /listkeywords - 列出關鍵字 List keywords
+• /reload - 重新載入 Reload keywords
+
+👤 用戶管理 User Management:
+• /unmute <ID> - 解除禁言 Unmute user
+
+⚙️ 設定 Settings:
+• /setmutetime <秒> - 設定禁言時長 Set mute duration
+
+📊 其他 Other:
+• /stats - 查看統計 View statistics
+• /help - 顯示幫助 Show help
+
+💡 提示 Tips:
+• 僅限管理員 Admin only
+• Bot 需要管理員權限 Bot needs admin rights
+"""
+_PONG_TEXT = "🏓 Pong! Bot 運作正常 / Bot is running"
+
+
+def invalidate_admin(chat_id: int) -> None:
+    """群組管理員異動時移除快取，讓下次檢查重新查詢"""
+    _admin_cache.pop(chat_id, None)
+    _admin_inflight.pop(chat_id, None)
+
+
+def is_known_admin(chat_id: int, user_id: int) -> bool:
+    """僅查詢快取：管理員名單已快取且未過期，且該用戶在名單中"""
+    cached = _admin_cache.get(chat_id)
+    return (
+        cached is not None
+        and time.monotonic() - cached[0] < ADMIN_CACHE_TTL
+        and user_id in cached[1]
+    )
+
+
+def is_known_admin_message(message: Message) -> bool:
+    """
+    不需呼叫 API 即可確認發送者為管理員的群組訊息
+
+    包含匿名管理員、連結頻道的自動轉發、超級管理員、已快取的管理員；
+    以其他頻道身分發送的訊息不在此列
+    """
+    if _is_admin_sender_chat(message):
+        return True
+    user = message.from_user
+    return user is not None and (
+        user.id in config.SUPERADMIN_IDS or is_known_admin(message.chat_id, user.id)
+    )
+
+
+def _is_admin_sender_chat(message: Message) -> bool:
+    """檢查是否以群組匿名管理員身分發送，或為連結頻道自動轉發的貼文"""
+    sender_chat = message.sender_chat
+    if not sender_chat:
+        return False
+    # 如果是以群組匿名管理員身分發送
+    if sender_chat.id == message.chat_id:
+        return True
+    # 連結頻道的貼文由 Telegram 自動轉發至討論群，視為管理員
+    # （任何人都能以自己的頻道身分發言，其他頻道發送者仍需經過一般檢查）
+    return sender_chat.type == "channel" and bool(message.is_automatic_forward)
+
+
+def _is_admin_sync(update: Update) -> bool:
+    """不需呼叫 API 即可確認的管理員情況（私聊、匿名管理員、超級管理員）"""
     if update.effective_chat.type == "private":
         return True
 
-    # 檢查是否以頻道身分發送（頻道連結的討論群）
-    if update.message and update.message.sender_chat:
-        sender_chat = update.message.sender_chat
-        # 如果是以頻道身分發送，且頻道是群組的連結頻道，視為管理員
-        if sender_chat.type == "channel":
-            return True
-        # 如果是以群組匿名管理員身分發送
-        if sender_chat.id == update.effective_chat.id:
-            return True
+    # 檢查是否以匿名管理員身分發送或為連結頻道的自動轉發
+    if update.message and _is_admin_sender_chat(update.message):
+        return True
+
+    # 超級管理員不必查詢 Telegram
+    return bool(update.effective_user and update.effective_user.id in config.SUPERADMIN_IDS)
+
+
+async def is_admin(update: Update) -> bool:
+    """檢查用戶是否為管理員（無法確認身分時視為非管理員）"""
+    return bool(await get_admin_status(update))
+
+
+async def get_admin_status(update: Update) -> Optional[bool]:
+    """
+    檢查用戶是否為管理員，無法確認身分時回傳 None
+
+    供需要區分「非管理員」與「查詢失敗」的呼叫端使用
+    """
+    if _is_admin_sync(update):
+        return True
+    return await _member_admin_status(update)
 
-    # 一般用戶檢查
-    if update.effective_user:
-        try:
-            member = await update.effective_chat.get_member(update.effective_user.id)
-            return member.status in ("administrator", "creator")
-        except TelegramError:
-            return False
+
+async def _member_admin_status(update: Update) -> Optional[bool]:
+    """一般用戶檢查：比對群組管理員名單（使用快取），查詢失敗時回傳 None"""
+    user = update.effective_user
+    if user:
+        admins = await _get_chat_admins(update.effective_chat)
+        if admins is None:
+            return None
+        if user.id in admins:
+            return True
+        # get_administrators 預設不列出其他 Bot，Bot 另以 get_member 確認
+        if user.is_bot:
+            return await _fetch_bot_admin_status(update.effective_chat, user.id)
+        return False
 
     return False
 
 
+async def _fetch_bot_admin_status(chat, user_id: int) -> Optional[bool]:
+    """查詢 Bot 是否為管理員；是管理員時併入已快取的管理員名單，查詢失敗時回傳 None"""
+    try:
+        member = await chat.get_member(user_id)
+    except TelegramError as e:
+        logger.error("Failed to get member status: %s", e)
+        return None
+
+    if member.status not in ("administrator", "creator"):
+        return False
+
+    cached = _admin_cache.get(chat.id)
+    if cached is not None:
+        _admin_cache[chat.id] = (cached[0], cached[1] | {user_id})
+    return True
+
+
+async def _get_chat_admins(chat) -> Optional[frozenset[int]]:
+    """取得群組管理員 ID 集合（使用快取），查詢失敗時回傳 None"""
+    cached = _admin_cache.get(chat.id)
+    if cached is not None and time.monotonic() - cached[0] < ADMIN_CACHE_TTL:
+        _admin_cache.move_to_end(chat.id)
+        return cached[1]
+
+    task = _admin_inflight.get(chat.id)
+    if task is None:
+        task = asyncio.create_task(_fetch_chat_admins(chat))
+        _admin_inflight[chat.id] = task
+    return await asyncio.shield(task)
+
+
+async def _fetch_chat_admins(chat) -> Optional[frozenset[int]]:
+    """向 Telegram 查詢管理員名單並寫入快取（查詢失敗時不快取，回傳 None）"""
+    task = asyncio.current_task()
+    try:
+        try:
+            members = await chat.get_administrators()
+        except TelegramError as e:
+            logger.error("Failed to get chat administrators: %s", e)
+            return None
+
+        admins = frozenset(member.user.id for member in members)
+        # 查詢期間管理員已異動時，不以舊結果覆蓋快取
+        if _admin_inflight.get(chat.id) is task:
+            _admin_cache[chat.id] = (time.monotonic(), admins)
+            _admin_cache.move_to_end(chat.id)
+            if len(_admin_cache) > ADMIN_CACHE_MAX_SIZE:
+                _admin_cache.popitem(last=False)
+        return admins
+    finally:
+        if _admin_inflight.get(chat.id) is task:
+            del _admin_inflight[chat.id]
+
+
 async def admin_required(update: Update) -> bool:
     """管理員權限檢查裝飾器輔助函數"""
     if not await is_admin(update):
@@ -48,6 +229,26 @@ async def admin_required(update: Update) -> bool:
     return True
 
 
+def chat_serialized(callback):
+    """
+    讓修改狀態的指令在同一群組內依序執行，不同群組之間仍可並行
+
+    鎖存放於 bot_data["chat_locks"]；沒有指令持有時自動釋放
+    """
+    @functools.wraps(callback)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        chat_locks = context.bot_data.setdefault("chat_locks", weakref.WeakValueDictionary())
+        chat_id = update.effective_chat.id
+        lock = chat_locks.get(chat_id)
+        if lock is None:
+            lock = chat_locks[chat_id] = asyncio.Lock()
+        async with lock:
+            await callback(update, context)
+
+    return wrapper
+
+
+@chat_serialized
 async def cmd_addkeyword(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """新增敏感關鍵字"""
     if not await admin_required(update):
@@ -66,11 +267,12 @@ async def cmd_addkeyword(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     if spam_filter.add_keyword(keyword):
         await update.message.reply_text(f"✅ 已新增關鍵字 / Keyword added: {keyword}")
-        logger.info(f"Admin {update.effective_user.id} added keyword: {keyword}")
+        logger.info("Admin %s added keyword: %s", update.effective_user.id, keyword)
     else:
         await update.message.reply_text(f"⚠️ 關鍵字已存在 / Keyword already exists: {keyword}")
 
 
+@chat_serialized
 async def cmd_delkeyword(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """刪除敏感關鍵字"""
     if not await admin_required(update):
@@ -89,7 +291,7 @@ async def cmd_delkeyword(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     if spam_filter.remove_keyword(keyword):
         await update.message.reply_text(f"✅ 已刪除關鍵字 / Keyword deleted: {keyword}")
-        logger.info(f"Admin {update.effective_user.id} removed keyword: {keyword}")
+        logger.info("Admin %s removed keyword: %s", update.effective_user.id, keyword)
     else:
         await update.message.reply_text(f"⚠️ 關鍵字不存在 / Keyword not found: {keyword}")
 
@@ -105,15 +307,13 @@ async def cmd_listkeywords(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         await update.message.reply_text("❌ 系統錯誤 / System error")
         return
 
-    keywords = spam_filter.get_keywords()
+    pages = _get_keyword_pages(spam_filter)
 
-    if not keywords:
+    if not pages:
         await update.message.reply_text("📝 目前沒有設定任何關鍵字\nNo keywords configured")
         return
 
-    # 分頁顯示（每頁 50 個）
-    page_size = 50
-    total_pages = (len(keywords) + page_size - 1) // page_size
+    total_pages = len(pages)
 
     # 取得頁碼參數
     page = 1
@@ -123,12 +323,8 @@ async def cmd_listkeywords(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         except ValueError:
             pass
 
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    page_keywords = keywords[start_idx:end_idx]
-
-    message = f"📝 關鍵字列表 / Keyword List (第 {page}/{total_pages} 頁，共 {len(keywords)} 個)\n\n"
-    message += "\n".join(f"• {kw}" for kw in page_keywords)
+    message = f"📝 關鍵字列表 / Keyword List (第 {page}/{total_pages} 頁，共 {len(spam_filter.keywords)} 個)\n\n"
+    message += pages[page - 1]
 
     if total_pages > 1:
         message += f"\n\n使用 /listkeywords <頁碼> 查看其他頁\nUse /listkeywords <page> to view other pages"
@@ -136,6 +332,21 @@ async def cmd_listkeywords(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     await update.message.reply_text(message)
 
 
+def _get_keyword_pages(spam_filter: SpamFilter) -> list[str]:
+    """取得分頁後的關鍵字列表（依 SpamFilter.version 快取）"""
+    global _keyword_pages
+    version, pages = _keyword_pages
+    if version != spam_filter.version:
+        keywords = spam_filter.get_keywords()
+        pages = [
+            "\n".join(f"• {kw}" for kw in keywords[i:i + KEYWORDS_PAGE_SIZE])
+            for i in range(0, len(keywords), KEYWORDS_PAGE_SIZE)
+        ]
+        _keyword_pages = (spam_filter.version, pages)
+    return pages
+
+
+@chat_serialized
 async def cmd_unmute(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """解除用戶禁言"""
     if not await admin_required(update):
@@ -159,25 +370,13 @@ async def cmd_unmute(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     try:
         await update.effective_chat.restrict_member(
             user_id=target_user_id,
-            permissions=ChatPermissions(
-                can_send_messages=True,
-                can_send_audios=True,
-                can_send_documents=True,
-                can_send_photos=True,
-                can_send_videos=True,
-                can_send_video_notes=True,
-                can_send_voice_notes=True,
-                can_send_polls=True,
-                can_send_other_messages=True,
-                can_add_web_page_previews=True,
-                can_invite_users=True,
-            ),
+            permissions=FULL_PERMISSIONS,
         )
         await update.message.reply_text(f"✅ 已解除用戶 {target_user_id} 的禁言\nUser {target_user_id} unmuted")
-        logger.info(f"Admin {update.effective_user.id} unmuted user {target_user_id}")
+        logger.info("Admin %s unmuted user %s", update.effective_user.id, target_user_id)
     except TelegramError as e:
         await update.message.reply_text(f"❌ 解除禁言失敗 / Unmute failed: {e}")
-        logger.error(f"Failed to unmute user {target_user_id}: {e}")
+        logger.error("Failed to unmute user %s: %s", target_user_id, e)
 
 
 async def cmd_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -194,31 +393,29 @@ async def cmd_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     chat_id = update.effective_chat.id if update.effective_chat.type != "private" else None
     stats = await db.get_stats(chat_id)
 
-    message = "📊 統計資料 / Statistics\n\n"
-
-    if chat_id:
-        message += f"📍 本群組統計 / This Group:\n"
-    else:
-        message += f"🌐 全域統計 / Global:\n"
-
-    message += f"• 總違規次數 Total violations: {stats['total_violations']}\n"
-    message += f"• 今日違規 Today: {stats['today_violations']}\n"
-    message += f"• 記錄用戶數 Users: {stats['total_users']}\n"
-    message += f"• 待驗證成員 Pending: {stats['pending_verifications']}\n"
+    # 各段內容先收集於列表，最後一次串接
+    parts = [
+        "📊 統計資料 / Statistics\n\n",
+        "📍 本群組統計 / This Group:\n" if chat_id else "🌐 全域統計 / Global:\n",
+        f"• 總違規次數 Total violations: {stats['total_violations']}\n",
+        f"• 今日違規 Today: {stats['today_violations']}\n",
+        f"• 記錄用戶數 Users: {stats['total_users']}\n",
+        f"• 待驗證成員 Pending: {stats['pending_verifications']}\n",
+    ]
 
     # 取得最近違規記錄
     if chat_id:
         recent = await db.get_recent_violations(chat_id, limit=5)
         if recent:
-            message += f"\n📋 最近違規記錄 / Recent Violations:\n"
-            for v in recent:
-                username = v.get("username") or v.get("first_name") or str(v["user_id"])
-                keyword = v["matched_keyword"][:20]
-                message += f"• {username}: {keyword}\n"
+            parts.append("\n📋 最近違規記錄 / Recent Violations:\n")
+            parts.extend(
+                f"• {v['display_name']}: {v['matched_keyword'][:20]}\n" for v in recent
+            )
 
-    await update.message.reply_text(message)
+    await update.message.reply_text("".join(parts))
 
 
+@chat_serialized
 async def cmd_setmutetime(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """設定禁言時長"""
     if not await admin_required(update):
@@ -254,9 +451,12 @@ async def cmd_setmutetime(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     hours = seconds / 3600
     await update.message.reply_text(f"✅ 禁言時長已設定為 {seconds} 秒 ({hours:.1f} 小時)\nMute duration set to {seconds}s ({hours:.1f}h)")
-    logger.info(f"Admin {update.effective_user.id} set mute time to {seconds}s in chat {chat_id}")
+    logger.info(
+        "Admin %s set mute time to %ss in chat %s", update.effective_user.id, seconds, chat_id
+    )
 
 
+@chat_serialized
 async def cmd_reload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """重新載入關鍵字列表"""
     if not await admin_required(update):
@@ -277,59 +477,40 @@ async def cmd_reload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         f"• 一般關鍵字 Keywords: {len(keywords)}\n"
         f"• 正則表達式 Regex: {regex_count}"
     )
-    logger.info(f"Admin {update.effective_user.id} reloaded keywords")
+    logger.info("Admin %s reloaded keywords", update.effective_user.id)
 
 
 async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """顯示幫助訊息"""
-    help_text = """
-🧹 SweepMonk 掃地僧 - Group Guardian
-
-📝 關鍵字管理 Keyword Management:
-• /addkeyword <詞> - 新增關鍵字 Add keyword
-• /delkeyword <詞> - 刪除關鍵字 Delete keyword
-• /listkeywords - 列出關鍵字 List keywords
-• /reload - 重新載入 Reload keywords
-
-👤 用戶管理 User Management:
-• /unmute <ID> - 解除禁言 Unmute user
-
-⚙️ 設定 Settings:
-• /setmutetime <秒> - 設定禁言時長 Set mute duration
-
-📊 其他 Other:
-• /stats - 查看統計 View statistics
-• /help - 顯示幫助 Show help
-
-💡 提示 Tips:
-• 僅限管理員 Admin only
-• Bot 需要管理員權限 Bot needs admin rights
-"""
-    await update.message.reply_text(help_text)
+    await update.message.reply_text(_HELP_TEXT)
 
 
 async def cmd_ping(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """測試指令"""
-    print(f"[DEBUG] ping received from {update.effective_user.id}", flush=True)
-    await update.message.reply_text("🏓 Pong! Bot 運作正常 / Bot is running")
+    logger.debug("Ping received from %s", update.effective_user.id)
+    await update.message.reply_text(_PONG_TEXT)
+
+
+# 指令名稱 -> 處理函數
+_COMMANDS = (
+    ("ping", cmd_ping),
+    ("addkeyword", cmd_addkeyword),
+    ("delkeyword", cmd_delkeyword),
+    ("listkeywords", cmd_listkeywords),
+    ("unmute", cmd_unmute),
+    ("stats", cmd_stats),
+    ("setmutetime", cmd_setmutetime),
+    ("reload", cmd_reload),
+    ("help", cmd_help),
+    ("start", cmd_help),
+)
 
 
 def setup_admin_handlers(application) -> None:
     """設定管理員指令處理器"""
-    handlers = [
-        CommandHandler("ping", cmd_ping),
-        CommandHandler("addkeyword", cmd_addkeyword),
-        CommandHandler("delkeyword", cmd_delkeyword),
-        CommandHandler("listkeywords", cmd_listkeywords),
-        CommandHandler("unmute", cmd_unmute),
-        CommandHandler("stats", cmd_stats),
-        CommandHandler("setmutetime", cmd_setmutetime),
-        CommandHandler("reload", cmd_reload),
-        CommandHandler("help", cmd_help),
-        CommandHandler("start", cmd_help),
-    ]
-
-    for handler in handlers:
-        application.add_handler(handler)
+    # block=False：指令在背景執行，較慢的指令不會阻塞後續更新的分派
+    application.add_handlers(
+        [CommandHandler(command, callback, block=False) for command, callback in _COMMANDS]
+    )
 
     logger.info("Admin handlers registered")
@@ -6,10 +6,15 @@
 - 超時未驗證自動踢出
 """
 
+import asyncio
+import base64
+import heapq
 import logging
-from datetime import datetime, timedelta
+import struct
+import time
+from typing import Optional
 
-from telegram import Update, ChatPermissions, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Bot, Update, ChatPermissions, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     ContextTypes,
     ChatMemberHandler,
@@ -20,79 +25,106 @@ from telegram.ext import (
 from telegram.error import TelegramError
 
 from database.db import Database
-import config
+from handlers.admin import invalidate_admin
 
 logger = logging.getLogger(__name__)
 
-# 驗證按鈕回調數據前綴
-VERIFY_CALLBACK_PREFIX = "verify_"
+# 驗證按鈕回調數據前綴：v + base64(user_id, chat_id)
+VERIFY_CALLBACK_PREFIX = "v"
+# 舊版回調數據前綴（verify_{user_id}_{chat_id}），仍可解析已發出的按鈕
+LEGACY_VERIFY_CALLBACK_PREFIX = "verify_"
+VERIFY_CALLBACK_STRUCT = struct.Struct("<qq")
+
+# 待驗證成員：禁止發送任何訊息
+MUTED_PERMISSIONS = ChatPermissions(
+    can_send_messages=False,
+    can_send_audios=False,
+    can_send_documents=False,
+    can_send_photos=False,
+    can_send_videos=False,
+    can_send_video_notes=False,
+    can_send_voice_notes=False,
+    can_send_polls=False,
+    can_send_other_messages=False,
+    can_add_web_page_previews=False,
+)
 
+# 驗證通過：恢復一般成員權限
+FULL_PERMISSIONS = ChatPermissions(
+    can_send_messages=True,
+    can_send_audios=True,
+    can_send_documents=True,
+    can_send_photos=True,
+    can_send_videos=True,
+    can_send_video_notes=True,
+    can_send_voice_notes=True,
+    can_send_polls=True,
+    can_send_other_messages=True,
+    can_add_web_page_previews=True,
+    can_invite_users=True,
+    can_pin_messages=False,
+    can_change_info=False,
+)
 
-async def handle_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """處理新成員加入事件"""
-    # Debug: 記錄所有 chat_member 更新
-    logger.info(f"ChatMember update received: {update}")
+# 超時踢出：以短暫封禁取代封禁後立即解封，到期後 Telegram 自動解封
+# （封禁少於 30 秒會被視為永久封禁；到期時間在送出前就已算好，
+#  請求可能因速率限制排隊或 RetryAfter 重試而延後，因此保留充足餘裕）
+KICK_BAN_DURATION = 120
 
-    chat_member = update.chat_member
-    if not chat_member:
-        logger.warning("No chat_member in update")
-        return
+# 批次處理過期驗證時，同時進行的 Telegram API 請求上限（全域限制約每秒 30 則）
+EXPIRE_CONCURRENCY = 20
 
-    # 檢查是否為新成員加入
-    old_status = chat_member.old_chat_member.status
-    new_status = chat_member.new_chat_member.status
+# 具管理員身分的成員狀態
+ADMIN_STATUSES = ("administrator", "creator")
 
-    logger.info(f"Status change: {old_status} -> {new_status} for user {chat_member.new_chat_member.user.id}")
 
-    # 只處理真正的新成員加入（從 left/kicked 變成 member）
-    # 不處理 restricted -> restricted（這是 Bot 自己限制用戶時產生的）
-    if old_status in ("left", "kicked") and new_status == "member":
-        user = chat_member.new_chat_member.user
-        chat = chat_member.chat
+# 正在處理驗證流程的 (user_id, chat_id)，避免同一成員的多個更新並行處理
+_verifications_in_progress: set[tuple[int, int]] = set()
 
-        # 忽略 Bot 自己
-        if user.is_bot:
-            return
 
-        logger.info(f"New member joined: {user.id} ({user.username}) in chat {chat.id}")
+def _encode_verify_data(user_id: int, chat_id: int) -> str:
+    """將 (user_id, chat_id) 打包為精簡的回調數據（25 bytes，低於 64 bytes 上限）"""
+    packed = VERIFY_CALLBACK_STRUCT.pack(user_id, chat_id)
+    return VERIFY_CALLBACK_PREFIX + base64.urlsafe_b64encode(packed).decode("ascii")
 
-        db: Database = context.bot_data.get("database")
-        if not db:
-            logger.error("Database not initialized")
-            return
 
-        # 檢查是否已經在待驗證狀態（避免重複處理）
+def _decode_verify_data(data: str) -> tuple[int, int]:
+    """解析驗證按鈕的回調數據，格式錯誤時拋出 ValueError 或 struct.error"""
+    if data.startswith(LEGACY_VERIFY_CALLBACK_PREFIX):
+        user_id, chat_id = map(int, data[len(LEGACY_VERIFY_CALLBACK_PREFIX):].split("_"))
+        return user_id, chat_id
+    if not data.startswith(VERIFY_CALLBACK_PREFIX):
+        raise ValueError(f"Unexpected callback data: {data}")
+    return VERIFY_CALLBACK_STRUCT.unpack(base64.urlsafe_b64decode(data[len(VERIFY_CALLBACK_PREFIX):]))
+
+
+async def _start_verification(
+    context: ContextTypes.DEFAULT_TYPE, db: Database, chat, user, verification_timeout: int
+) -> None:
+    """限制新成員並發送驗證訊息"""
+    key = (user.id, chat.id)
+    # 檢查與登記之間沒有 await，並行的更新不會同時通過
+    if key in _verifications_in_progress:
+        logger.info("User %s verification already in progress, skipping", user.id)
+        return
+
+    _verifications_in_progress.add(key)
+    try:
+        # 檢查是否已經在待驗證狀態（避免重複處理，可能已被另一個 handler 處理）
         existing = await db.get_pending_verification(user.id, chat.id)
         if existing:
-            logger.info(f"User {user.id} already pending verification, skipping")
+            logger.info("User %s already pending verification, skipping", user.id)
             return
 
-        # 取得群組設定
-        chat_settings = await db.get_chat_settings(chat.id)
-        verification_timeout = chat_settings.get(
-            "verification_timeout", config.VERIFICATION_TIMEOUT
-        )
-
         # 1. 限制新成員發言權限
         try:
             await chat.restrict_member(
                 user_id=user.id,
-                permissions=ChatPermissions(
-                    can_send_messages=False,
-                    can_send_audios=False,
-                    can_send_documents=False,
-                    can_send_photos=False,
-                    can_send_videos=False,
-                    can_send_video_notes=False,
-                    can_send_voice_notes=False,
-                    can_send_polls=False,
-                    can_send_other_messages=False,
-                    can_add_web_page_previews=False,
-                ),
+                permissions=MUTED_PERMISSIONS,
             )
-            logger.info(f"Restricted new member {user.id}")
+            logger.info("Restricted new member %s", user.id)
         except TelegramError as e:
-            logger.error(f"Failed to restrict member: {e}")
+            logger.error("Failed to restrict member: %s", e)
             return
 
         # 2. 發送驗證訊息
@@ -103,7 +135,7 @@ async def handle_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE)
             [
                 InlineKeyboardButton(
                     "✅ 我不是機器人 / I'm not a robot",
-                    callback_data=f"{VERIFY_CALLBACK_PREFIX}{user.id}_{chat.id}",
+                    callback_data=_encode_verify_data(user.id, chat.id),
                 )
             ]
         ])
@@ -115,31 +147,73 @@ async def handle_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 f"Please click the button within {timeout_minutes} minutes to verify, or you will be removed.",
                 reply_markup=keyboard,
             )
-            logger.info(f"Sent verification message for user {user.id}")
+            logger.info("Sent verification message for user %s", user.id)
         except TelegramError as e:
-            logger.error(f"Failed to send verification message: {e}")
+            logger.error("Failed to send verification message: %s", e)
             return
 
-        # 3. 記錄待驗證狀態
-        expires_at = datetime.now() + timedelta(seconds=verification_timeout)
+        # 3. 記錄待驗證狀態，並排入到期排程（超時由排程統一處理）
+        expires_at = int(time.time()) + verification_timeout
         await db.add_pending_verification(
             user_id=user.id,
             chat_id=chat.id,
             message_id=verify_message.message_id,
             expires_at=expires_at,
         )
+        scheduler: VerificationExpiryScheduler = context.bot_data.get("expiry_scheduler")
+        if scheduler:
+            scheduler.schedule(expires_at, user.id, chat.id)
+    finally:
+        _verifications_in_progress.discard(key)
 
-        # 4. 設定超時任務
-        context.job_queue.run_once(
-            verification_timeout_callback,
-            when=verification_timeout,
-            data={
-                "user_id": user.id,
-                "chat_id": chat.id,
-                "message_id": verify_message.message_id,
-            },
-            name=f"verify_timeout_{user.id}_{chat.id}",
-        )
+
+async def handle_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """處理新成員加入事件"""
+    # Debug: 記錄所有 chat_member 更新
+    logger.info("ChatMember update received: %s", update)
+
+    chat_member = update.chat_member
+    if not chat_member:
+        logger.warning("No chat_member in update")
+        return
+
+    # 檢查是否為新成員加入
+    old_status = chat_member.old_chat_member.status
+    new_status = chat_member.new_chat_member.status
+
+    logger.info(
+        "Status change: %s -> %s for user %s",
+        old_status, new_status, chat_member.new_chat_member.user.id,
+    )
+
+    # 升降管理員後，該群組的管理員名單快取不再可信
+    if old_status != new_status and (
+        old_status in ADMIN_STATUSES or new_status in ADMIN_STATUSES
+    ):
+        invalidate_admin(chat_member.chat.id)
+
+    # 只處理真正的新成員加入（從 left/kicked 變成 member）
+    # 不處理 restricted -> restricted（這是 Bot 自己限制用戶時產生的）
+    if old_status in ("left", "kicked") and new_status == "member":
+        user = chat_member.new_chat_member.user
+        chat = chat_member.chat
+
+        # 忽略 Bot 自己
+        if user.is_bot:
+            return
+
+        logger.info("New member joined: %s (%s) in chat %s", user.id, user.username, chat.id)
+
+        db: Database = context.bot_data.get("database")
+        if not db:
+            logger.error("Database not initialized")
+            return
+
+        # 取得群組設定
+        chat_settings = await db.get_chat_settings(chat.id)
+        verification_timeout = chat_settings.verification_timeout
+
+        await _start_verification(context, db, chat, user, verification_timeout)
 
 
 async def handle_verification_button(
@@ -148,14 +222,10 @@ async def handle_verification_button(
     """處理驗證按鈕點擊"""
     query = update.callback_query
 
-    if not query.data.startswith(VERIFY_CALLBACK_PREFIX):
-        return
-
     # 解析回調數據
     try:
-        data = query.data[len(VERIFY_CALLBACK_PREFIX):]
-        user_id, chat_id = map(int, data.split("_"))
-    except ValueError:
+        user_id, chat_id = _decode_verify_data(query.data)
+    except (ValueError, struct.error):
         await query.answer("驗證資料錯誤 / Verification data error")
         return
 
@@ -184,38 +254,18 @@ async def handle_verification_button(
         await context.bot.restrict_chat_member(
             chat_id=chat_id,
             user_id=user_id,
-            permissions=ChatPermissions(
-                can_send_messages=True,
-                can_send_audios=True,
-                can_send_documents=True,
-                can_send_photos=True,
-                can_send_videos=True,
-                can_send_video_notes=True,
-                can_send_voice_notes=True,
-                can_send_polls=True,
-                can_send_other_messages=True,
-                can_add_web_page_previews=True,
-                can_invite_users=True,
-                can_pin_messages=False,
-                can_change_info=False,
-            ),
+            permissions=FULL_PERMISSIONS,
         )
-        logger.info(f"Restored permissions for user {user_id}")
+        logger.info("Restored permissions for user %s", user_id)
     except TelegramError as e:
-        logger.error(f"Failed to restore permissions: {e}")
+        logger.error("Failed to restore permissions: %s", e)
         await query.answer("驗證失敗，請聯繫管理員 / Verification failed, contact admin")
         return
 
-    # 2. 移除待驗證記錄
+    # 2. 移除待驗證記錄（到期排程中的項目不必取消，到期時找不到記錄即略過）
     await db.remove_pending_verification(user_id, chat_id)
 
-    # 3. 取消超時任務
-    job_name = f"verify_timeout_{user_id}_{chat_id}"
-    current_jobs = context.job_queue.get_jobs_by_name(job_name)
-    for job in current_jobs:
-        job.schedule_removal()
-
-    # 4. 更新驗證訊息
+    # 3. 更新驗證訊息
     await query.answer("✅ 驗證成功！歡迎加入！\nVerification successful! Welcome!")
     try:
         user_mention = (
@@ -225,51 +275,19 @@ async def handle_verification_button(
         )
         await query.message.edit_text(f"✅ {user_mention} 驗證成功！歡迎加入群組！\n{user_mention} verified! Welcome to the group!")
     except TelegramError as e:
-        logger.error(f"Failed to edit verification message: {e}")
-
-    logger.info(f"User {user_id} verified successfully in chat {chat_id}")
-
+        logger.error("Failed to edit verification message: %s", e)
 
-async def verification_timeout_callback(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """驗證超時回調"""
-    job = context.job
-    data = job.data
-    user_id = data["user_id"]
-    chat_id = data["chat_id"]
-    message_id = data["message_id"]
+    logger.info("User %s verified successfully in chat %s", user_id, chat_id)
 
-    db: Database = context.bot_data.get("database")
-    if not db:
-        return
 
-    # 檢查是否還在待驗證狀態
-    pending = await db.get_pending_verification(user_id, chat_id)
-    if not pending:
-        return
-
-    logger.info(f"Verification timeout for user {user_id} in chat {chat_id}")
-
-    # 1. 踢出用戶
-    try:
-        await context.bot.ban_chat_member(chat_id=chat_id, user_id=user_id)
-        # 立即解除封禁，允許重新加入
-        await context.bot.unban_chat_member(chat_id=chat_id, user_id=user_id)
-        logger.info(f"Kicked user {user_id} for verification timeout")
-    except TelegramError as e:
-        logger.error(f"Failed to kick user: {e}")
-
-    # 2. 移除待驗證記錄
-    await db.remove_pending_verification(user_id, chat_id)
-
-    # 3. 更新驗證訊息
-    try:
-        await context.bot.edit_message_text(
-            chat_id=chat_id,
-            message_id=message_id,
-            text="⏰ 驗證超時，用戶已被移出群組。\nVerification timeout, user has been removed.",
-        )
-    except TelegramError as e:
-        logger.error(f"Failed to edit timeout message: {e}")
+async def _kick_member(bot: Bot, chat_id: int, user_id: int) -> None:
+    """以單一 API 呼叫踢出成員，封禁到期後即可重新加入"""
+    await bot.ban_chat_member(
+        chat_id=chat_id,
+        user_id=user_id,
+        until_date=int(time.time()) + KICK_BAN_DURATION,
+        revoke_messages=False,
+    )
 
 
 async def handle_new_chat_members(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -286,117 +304,118 @@ async def handle_new_chat_members(update: Update, context: ContextTypes.DEFAULT_
 
     # 取得群組設定
     chat_settings = await db.get_chat_settings(chat.id)
-    verification_timeout = chat_settings.get(
-        "verification_timeout", config.VERIFICATION_TIMEOUT
-    )
+    verification_timeout = chat_settings.verification_timeout
 
     for user in message.new_chat_members:
         # 忽略 Bot 自己
         if user.is_bot:
             continue
 
-        logger.info(f"New member joined (via message): {user.id} ({user.username}) in chat {chat.id}")
+        logger.info(
+            "New member joined (via message): %s (%s) in chat %s", user.id, user.username, chat.id
+        )
 
-        # 檢查是否已經在待驗證狀態（避免重複處理，可能已被 ChatMemberHandler 處理）
-        existing = await db.get_pending_verification(user.id, chat.id)
-        if existing:
-            logger.info(f"User {user.id} already pending verification (via message handler), skipping")
-            continue
+        await _start_verification(context, db, chat, user, verification_timeout)
 
-        # 1. 限制新成員發言權限
-        try:
-            await chat.restrict_member(
-                user_id=user.id,
-                permissions=ChatPermissions(
-                    can_send_messages=False,
-                    can_send_audios=False,
-                    can_send_documents=False,
-                    can_send_photos=False,
-                    can_send_videos=False,
-                    can_send_video_notes=False,
-                    can_send_voice_notes=False,
-                    can_send_polls=False,
-                    can_send_other_messages=False,
-                    can_add_web_page_previews=False,
-                ),
-            )
-            logger.info(f"Restricted new member {user.id}")
-        except TelegramError as e:
-            logger.error(f"Failed to restrict member: {e}")
-            continue
 
-        # 2. 發送驗證訊息
-        user_mention = f"@{user.username}" if user.username else user.first_name
-        timeout_minutes = verification_timeout // 60
+class VerificationExpiryScheduler:
+    """
+    以最小堆積記錄待驗證的到期時間，由單一背景任務在最早到期時喚醒處理
 
-        keyboard = InlineKeyboardMarkup([
-            [
-                InlineKeyboardButton(
-                    "✅ 我不是機器人 / I'm not a robot",
-                    callback_data=f"{VERIFY_CALLBACK_PREFIX}{user.id}_{chat.id}",
-                )
-            ]
-        ])
+    取代每分鐘輪詢：沒有待驗證成員時完全不喚醒
+    """
 
-        try:
-            verify_message = await chat.send_message(
-                f"👋 歡迎 {user_mention} 加入！\nWelcome {user_mention}!\n\n"
-                f"請在 {timeout_minutes} 分鐘內點擊下方按鈕完成驗證，否則將被自動移出群組。\n"
-                f"Please click the button within {timeout_minutes} minutes to verify, or you will be removed.",
-                reply_markup=keyboard,
+    def __init__(self, bot: Bot, db: Database):
+        self._bot = bot
+        self._db = db
+        # (expires_at, user_id, chat_id)；實際是否過期以資料庫記錄為準
+        self._heap: list[tuple[int, int, int]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, pending: list[dict] = ()) -> None:
+        """啟動背景任務，並排入啟動前已存在的待驗證記錄"""
+        for record in pending:
+            heapq.heappush(
+                self._heap, (record["expires_at"], record["user_id"], record["chat_id"])
             )
-            logger.info(f"Sent verification message for user {user.id}")
-        except TelegramError as e:
-            logger.error(f"Failed to send verification message: {e}")
-            continue
+        self._task = asyncio.create_task(self._run())
 
-        # 3. 記錄待驗證狀態
-        expires_at = datetime.now() + timedelta(seconds=verification_timeout)
-        await db.add_pending_verification(
-            user_id=user.id,
-            chat_id=chat.id,
-            message_id=verify_message.message_id,
-            expires_at=expires_at,
-        )
+    async def stop(self) -> None:
+        """停止背景任務"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def schedule(self, expires_at: int, user_id: int, chat_id: int) -> None:
+        """排入新的到期時間；比目前最早的更早時喚醒背景任務重新計算等待時間"""
+        heapq.heappush(self._heap, (expires_at, user_id, chat_id))
+        if self._heap[0][0] == expires_at:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        """等待最早的到期時間，屆時一次處理所有已過期的驗證"""
+        while True:
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            now = time.time()
+            if not self._heap or self._heap[0][0] > now:
+                continue
+            while self._heap and self._heap[0][0] <= now:
+                heapq.heappop(self._heap)
 
-        # 4. 設定超時任務
-        context.job_queue.run_once(
-            verification_timeout_callback,
-            when=verification_timeout,
-            data={
-                "user_id": user.id,
-                "chat_id": chat.id,
-                "message_id": verify_message.message_id,
-            },
-            name=f"verify_timeout_{user.id}_{chat.id}",
-        )
+            try:
+                await expire_verifications(self._bot, self._db)
+            except Exception as e:
+                logger.error("Failed to process expired verifications: %s", e)
 
 
-async def check_expired_verifications(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """定期檢查過期的驗證（備用機制）"""
-    db: Database = context.bot_data.get("database")
-    if not db:
+async def expire_verifications(bot: Bot, db: Database) -> None:
+    """踢出所有過期未驗證的成員"""
+    # 一次取回並移除所有過期記錄；已驗證或已處理的記錄不會出現
+    expired = await db.sweep_expired()
+    if not expired:
         return
 
-    expired = await db.get_expired_verifications()
-    for record in expired:
-        user_id = record["user_id"]
-        chat_id = record["chat_id"]
-        message_id = record.get("message_id")
+    # 各記錄互不相依，並行處理；以 semaphore 限制同時進行的請求數
+    semaphore = asyncio.Semaphore(EXPIRE_CONCURRENCY)
+    await asyncio.gather(
+        *(_expire_one(bot, record, semaphore) for record in expired),
+        return_exceptions=True,
+    )
+
 
-        logger.info(f"Found expired verification for user {user_id} in chat {chat_id}")
+async def _expire_one(bot: Bot, record: dict, semaphore: asyncio.Semaphore) -> None:
+    """踢出單一過期未驗證的成員並更新驗證訊息"""
+    user_id = record["user_id"]
+    chat_id = record["chat_id"]
+    message_id = record.get("message_id")
 
+    logger.info("Found expired verification for user %s in chat %s", user_id, chat_id)
+
+    async with semaphore:
         # 踢出用戶
         try:
-            await context.bot.ban_chat_member(chat_id=chat_id, user_id=user_id)
-            await context.bot.unban_chat_member(chat_id=chat_id, user_id=user_id)
+            await _kick_member(bot, chat_id, user_id)
+            logger.info("Kicked user %s for verification timeout", user_id)
         except TelegramError as e:
-            logger.error(f"Failed to kick user {user_id}: {e}")
+            logger.error("Failed to kick user %s: %s", user_id, e)
 
         # 更新訊息
         if message_id:
             try:
-                await context.bot.edit_message_text(
+                await bot.edit_message_text(
                     chat_id=chat_id,
                     message_id=message_id,
                     text="⏰ 驗證超時，用戶已被移出群組。\nVerification timeout, user has been removed.",
@@ -404,15 +423,12 @@ async def check_expired_verifications(context: ContextTypes.DEFAULT_TYPE) -> Non
             except TelegramError:
                 pass
 
-    # 清除過期記錄
-    await db.clear_expired_verifications()
-
 
 def setup_member_handlers(application) -> None:
     """設定成員處理器"""
     # 監聽成員狀態變化（主要方式）
     application.add_handler(
-        ChatMemberHandler(handle_new_member, ChatMemberHandler.CHAT_MEMBER)
+        ChatMemberHandler(handle_new_member, ChatMemberHandler.CHAT_MEMBER, block=False)
     )
 
     # 監聽 new_chat_members 服務訊息（備用方式，適用於某些群組）
@@ -420,23 +436,17 @@ def setup_member_handlers(application) -> None:
         MessageHandler(
             filters.StatusUpdate.NEW_CHAT_MEMBERS,
             handle_new_chat_members,
+            block=False,
         )
     )
 
-    # 監聽驗證按鈕點擊
+    # 監聽驗證按鈕點擊（前綴 v 同時涵蓋舊版 verify_ 格式）
     application.add_handler(
         CallbackQueryHandler(
             handle_verification_button,
             pattern=f"^{VERIFY_CALLBACK_PREFIX}",
+            block=False,
         )
     )
 
-    # 定期檢查過期驗證（每分鐘）
-    application.job_queue.run_repeating(
-        check_expired_verifications,
-        interval=60,
-        first=10,
-        name="check_expired_verifications",
-    )
-
     logger.info("Member handlers registered")
@@ -3,119 +3,255 @@
 監聽所有訊息並進行關鍵字過濾
 """
 
+import asyncio
+import functools
 import logging
-from datetime import datetime, timedelta
+import time
+from functools import lru_cache
+from typing import Optional
 
-from telegram import Update, ChatPermissions
+from telegram import Bot, Message, Update, ChatPermissions
 from telegram.ext import ContextTypes, MessageHandler, filters
 from telegram.error import TelegramError
 
 from filters.spam_filter import SpamFilter
-from database.db import Database
-import config
+from database.db import Database, ViolationWriter
+from handlers.admin import get_admin_status, is_known_admin_message
 
 logger = logging.getLogger(__name__)
 
+# 違規記錄只保存訊息的前若干字
+STORED_TEXT_MAX_LENGTH = 500
 
-async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """處理所有文字訊息"""
+# 違規用戶的禁言權限（固定內容，載入時建立一次）
+MUTED_PERMISSIONS = ChatPermissions(can_send_messages=False)
+
+# 檢查結果快取：洗版訊息多為重複內容，相同文字不必重新比對
+CHECK_CACHE_SIZE = 4096
+# 超過此長度的文字不快取，避免長訊息佔用快取
+CHECK_CACHE_MAX_TEXT_LENGTH = 512
+
+# 違規通知模板（載入時建立一次，處理違規時直接填入）
+_format_notification = (
+    "⚠️ 偵測到違規訊息 / Violation Detected\n\n"
+    "用戶 User: {mention} (ID: {user_id})\n"
+    "關鍵字 Keyword: {keyword}\n"
+    "處理 Action: 刪除訊息，禁言 {hours} 小時 / Deleted, muted {hours}h"
+).format_map
+
+# 同一群組在此秒數內的違規合併為一則通知，洗版時不會佔滿 Bot 的發送額度
+NOTIFY_BATCH_WINDOW = 3.0
+
+# 合併多筆違規時的通知模板
+_format_batch_notification = (
+    "⚠️ {window} 秒內偵測到 {count} 則違規訊息 / {count} violations in last {window}s\n\n"
+    "用戶 Users: {users}\n"
+    "關鍵字 Keywords: {keywords}\n"
+    "處理 Action: 刪除訊息，禁言 {hours} 小時 / Deleted, muted {hours}h"
+).format_map
+
+
+@lru_cache(maxsize=CHECK_CACHE_SIZE)
+def _check_cached(spam_filter: SpamFilter, version: int, lowered: str) -> Optional[str]:
+    """
+    快取關鍵字檢查結果
+
+    以 SpamFilter.version 作為鍵的一部分，關鍵字變更後舊結果自然失效
+    """
+    return spam_filter.check_message(lowered, lowered=lowered)
+
+
+def _check_message(spam_filter: SpamFilter, lowered: str) -> Optional[str]:
+    """檢查已轉為小寫的訊息是否包含敏感關鍵字，短文字使用快取"""
+    if len(lowered) <= CHECK_CACHE_MAX_TEXT_LENGTH:
+        return _check_cached(spam_filter, spam_filter.version, lowered)
+    return spam_filter.check_message(lowered, lowered=lowered)
+
+
+async def handle_message(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    spam_filter: SpamFilter,
+    db: Database,
+    violation_writer: ViolationWriter,
+) -> None:
+    """
+    處理所有文字訊息
+
+    spam_filter、db、violation_writer 於註冊時綁定（見 setup_message_handlers），
+    不必每則訊息查詢 bot_data
+    """
     message = update.message
-    if not message or not message.text:
+    if not message:
+        return
+    text = message.text
+    if not text:
         return
 
-    # 忽略私聊訊息
-    if message.chat.type == "private":
+    # 先以本地過濾器檢查，絕大多數訊息不會命中，可省去管理員身分查詢
+    # （只轉一次小寫，快取與各項比對共用；大小寫不同的重複訊息也能命中快取）
+    matched_keyword = _check_message(spam_filter, text.lower())
+    if not matched_keyword:
         return
 
-    # 忽略管理員訊息
-    user = message.from_user
-    try:
-        member = await message.chat.get_member(user.id)
-        if member.status in ("administrator", "creator"):
-            return
-    except TelegramError as e:
-        logger.error(f"Failed to get member status: {e}")
+    # 命中後才確認是否為管理員（管理員訊息不處理）
+    admin_status = await get_admin_status(update)
+    if admin_status is None:
         # 無法確認身份時，為安全起見不處理該訊息
         return
-
-    # 取得過濾器和資料庫
-    spam_filter: SpamFilter = context.bot_data.get("spam_filter")
-    db: Database = context.bot_data.get("database")
-
-    if not spam_filter or not db:
-        logger.error("Spam filter or database not initialized")
+    if admin_status:
         return
 
-    # 檢查訊息是否為垃圾訊息
-    matched_keyword = spam_filter.check_message(message.text)
+    # 以下多次使用的屬性先取為區域變數
+    chat = message.chat
+    chat_id = chat.id
+    user = message.from_user
+    user_id = user.id
+    username = user.username
 
-    if matched_keyword:
-        logger.info(
-            f"Spam detected from user {user.id} ({user.username}): keyword='{matched_keyword}'"
-        )
+    logger.info(
+        "Spam detected from user %s (%s): keyword='%s'",
+        user_id, username, matched_keyword,
+    )
 
-        # 取得群組設定
-        chat_settings = await db.get_chat_settings(message.chat_id)
-        mute_duration = chat_settings.get("mute_duration", config.DEFAULT_MUTE_DURATION)
+    # 取得群組設定
+    chat_settings = await db.get_chat_settings(chat_id)
+    mute_duration = chat_settings.mute_duration
 
+    # 直接傳入 Unix 時間戳，不必建立 datetime 再由 PTB 轉換（也避免本地時區問題）
+    until_date = int(time.time()) + mute_duration
+    actions = {
         # 1. 刪除訊息
+        "delete message": message.delete(),
+        # 2. 禁言用戶
+        "mute user": chat.restrict_member(
+            user_id=user_id,
+            permissions=MUTED_PERMISSIONS,
+            until_date=until_date,
+        ),
+    }
+
+    # 3. 記錄到資料庫（放入批次寫入器的佇列，不等待寫入）
+    violation_writer.put(
+        user_id=user_id,
+        chat_id=chat_id,
+        message_text=(
+            text if len(text) <= STORED_TEXT_MAX_LENGTH else text[:STORED_TEXT_MAX_LENGTH]
+        ),
+        matched_keyword=matched_keyword,
+        action_taken=f"deleted, muted for {mute_duration}s",
+        username=username,
+        first_name=user.first_name,
+        last_name=user.last_name,
+    )
+
+    # 4. 通知管理員（可選；短時間內的多筆違規合併通知）
+    if chat_settings.notify_admins:
+        batcher: NotificationBatcher = context.bot_data.get("notification_batcher")
+        if batcher:
+            batcher.enqueue(chat_id, {
+                "mention": f"@{username}" if username else user.first_name,
+                "user_id": user_id,
+                "keyword": matched_keyword,
+                "hours": mute_duration // 3600,
+            })
+
+    # 各項處理互不相依，並行執行；個別失敗不影響其他項目
+    results = await asyncio.gather(*actions.values(), return_exceptions=True)
+    failed = False
+    for action, result in zip(actions, results):
+        if isinstance(result, Exception):
+            failed = True
+            logger.error("Failed to %s: %s", action, result)
+
+    if not failed:
+        logger.info("Handled spam from user %s: deleted, muted for %s seconds", user_id, mute_duration)
+
+
+class NotificationBatcher:
+    """
+    依群組合併管理員通知
+
+    群組的第一筆違規開始計時，時間窗內的後續違規併入同一則通知；
+    只有一筆時沿用單筆通知格式
+    """
+
+    def __init__(self, bot: Bot, window: float = NOTIFY_BATCH_WINDOW):
+        self._bot = bot
+        self._window = window
+        # chat_id -> 時間窗內累積的違規
+        self._pending: dict[int, list[dict]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        # 關閉時設定，讓等待中的群組立即送出
+        self._closing = asyncio.Event()
+
+    def enqueue(self, chat_id: int, violation: dict) -> None:
+        """加入一筆違規；該群組沒有進行中的時間窗時開始計時"""
+        pending = self._pending.get(chat_id)
+        if pending is None:
+            pending = self._pending[chat_id] = []
+            self._tasks[chat_id] = asyncio.create_task(self._send_after_window(chat_id))
+        pending.append(violation)
+
+    async def close(self) -> None:
+        """立即送出所有累積中的通知"""
+        self._closing.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _send_after_window(self, chat_id: int) -> None:
+        """時間窗結束後送出該群組累積的通知"""
         try:
-            await message.delete()
-            logger.info(f"Deleted spam message from user {user.id}")
-        except TelegramError as e:
-            logger.error(f"Failed to delete message: {e}")
+            await asyncio.wait_for(self._closing.wait(), timeout=self._window)
+        except asyncio.TimeoutError:
+            pass
+
+        # 取出後的新違規會開始新的時間窗
+        batch = self._pending.pop(chat_id)
+        del self._tasks[chat_id]
 
-        # 2. 禁言用戶
         try:
-            until_date = datetime.now() + timedelta(seconds=mute_duration)
-            await message.chat.restrict_member(
-                user_id=user.id,
-                permissions=ChatPermissions(can_send_messages=False),
-                until_date=until_date,
-            )
-            logger.info(f"Muted user {user.id} for {mute_duration} seconds")
+            await self._bot.send_message(chat_id, self._format(batch))
         except TelegramError as e:
-            logger.error(f"Failed to mute user: {e}")
-
-        # 3. 記錄到資料庫
-        await db.get_or_create_user(
-            user_id=user.id,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-        )
-        await db.increment_violation_count(user.id)
-        await db.add_violation(
-            user_id=user.id,
-            chat_id=message.chat_id,
-            message_text=message.text[:500],  # 只保存前 500 字
-            matched_keyword=matched_keyword,
-            action_taken=f"deleted, muted for {mute_duration}s",
-        )
+            logger.error("Failed to send admin notification to chat %s: %s", chat_id, e)
+
+    def _format(self, batch: list[dict]) -> str:
+        """組成通知內容"""
+        if len(batch) == 1:
+            return _format_notification(batch[0])
+
+        users = dict.fromkeys(f"{v['mention']} ({v['user_id']})" for v in batch)
+        keywords = dict.fromkeys(v["keyword"] for v in batch)
+        return _format_batch_notification({
+            "window": f"{self._window:g}",
+            "count": len(batch),
+            "users": ", ".join(users),
+            "keywords": ", ".join(keywords),
+            "hours": batch[-1]["hours"],
+        })
+
+
+class _NotKnownAdminFilter(filters.MessageFilter):
+    """在分派前排除可直接確認為管理員的訊息，這類訊息不必排程處理協程"""
+
+    def filter(self, message: Message) -> bool:
+        return not is_known_admin_message(message)
+
 
-        # 4. 通知管理員（可選）
-        if chat_settings.get("notify_admins", config.NOTIFY_ADMINS):
-            try:
-                user_mention = f"@{user.username}" if user.username else user.first_name
-                hours = mute_duration // 3600
-                notification = (
-                    f"⚠️ 偵測到違規訊息 / Violation Detected\n\n"
-                    f"用戶 User: {user_mention} (ID: {user.id})\n"
-                    f"關鍵字 Keyword: {matched_keyword}\n"
-                    f"處理 Action: 刪除訊息，禁言 {hours} 小時 / Deleted, muted {hours}h"
-                )
-                await message.chat.send_message(notification)
-            except TelegramError as e:
-                logger.error(f"Failed to send admin notification: {e}")
-
-
-def setup_message_handlers(application) -> None:
-    """設定訊息處理器"""
-    # 監聽所有文字訊息（群組和超級群組），排除指令
+def setup_message_handlers(
+    application, spam_filter: SpamFilter, db: Database, violation_writer: ViolationWriter
+) -> None:
+    """設定訊息處理器（綁定啟動時建立的過濾器、資料庫與違規記錄寫入器）"""
+    # 監聽所有文字訊息（群組和超級群組），排除指令與已知管理員的訊息
     application.add_handler(
         MessageHandler(
-            filters.TEXT & ~filters.COMMAND & (filters.ChatType.GROUP | filters.ChatType.SUPERGROUP),
-            handle_message,
+            filters.TEXT & ~filters.COMMAND & filters.ChatType.GROUPS & _NotKnownAdminFilter(),
+            functools.partial(
+                handle_message,
+                spam_filter=spam_filter,
+                db=db,
+                violation_writer=violation_writer,
+            ),
         )
     )
     logger.info("Message handlers registered")